@@ -0,0 +1,39 @@
+"""Full-text search vector on products
+
+Revision ID: 0001_product_search_vector
+Revises:
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+
+revision = "0001_product_search_vector"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# Tables are created by Base.metadata.create_all on startup, so every statement here
+# is written to be a no-op on databases that already have the new objects.
+
+
+def upgrade():
+    op.execute(
+        """
+        ALTER TABLE products ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(description, '')), 'B')
+        ) STORED
+        """
+    )
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_search_vector "
+            "ON products USING gin (search_vector)"
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_products_search_vector")
+    op.execute("ALTER TABLE products DROP COLUMN IF EXISTS search_vector")
@@ -0,0 +1,29 @@
+"""GIN index on product categories for filtering and facets
+
+Revision ID: 0002_product_categories_gin
+Revises: 0001_product_search_vector
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+
+revision = "0002_product_categories_gin"
+down_revision = "0001_product_search_vector"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_categories_gin "
+            "ON products USING gin (categories)"
+        )
+        # The old btree index cannot serve array containment or ANY() lookups
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_products_categories")
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_categories ON products (categories)")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_products_categories_gin")
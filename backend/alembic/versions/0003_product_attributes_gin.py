@@ -0,0 +1,26 @@
+"""GIN index on product attributes for JSONB containment filters
+
+Revision ID: 0003_product_attributes_gin
+Revises: 0002_product_categories_gin
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+
+revision = "0003_product_attributes_gin"
+down_revision = "0002_product_categories_gin"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_attributes "
+            "ON products USING gin (attributes jsonb_path_ops)"
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_products_attributes")
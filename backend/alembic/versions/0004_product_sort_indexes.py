@@ -0,0 +1,32 @@
+"""created_at column and composite indexes for product listing sorts
+
+Revision ID: 0004_product_sort_indexes
+Revises: 0003_product_attributes_gin
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+
+revision = "0004_product_sort_indexes"
+down_revision = "0003_product_attributes_gin"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("ALTER TABLE products ADD COLUMN IF NOT EXISTS created_at timestamp NOT NULL DEFAULT now()")
+    with op.get_context().autocommit_block():
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_price_id ON products (price, id)")
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_name_id ON products (name, id)")
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_created_at_id ON products (created_at, id)")
+        # (name, id) serves every lookup the single-column name index did
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_products_name")
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_name ON products (name)")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_products_created_at_id")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_products_name_id")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_products_price_id")
+    op.execute("ALTER TABLE products DROP COLUMN IF EXISTS created_at")
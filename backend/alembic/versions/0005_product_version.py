@@ -0,0 +1,21 @@
+"""Version column on products for optimistic concurrency
+
+Revision ID: 0005_product_version
+Revises: 0004_product_sort_indexes
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+
+revision = "0005_product_version"
+down_revision = "0004_product_sort_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("ALTER TABLE products ADD COLUMN IF NOT EXISTS version integer NOT NULL DEFAULT 1")
+
+
+def downgrade():
+    op.execute("ALTER TABLE products DROP COLUMN IF EXISTS version")
@@ -0,0 +1,32 @@
+"""idempotency_keys table for POST /orders retries
+
+Revision ID: 0006_idempotency_keys
+Revises: 0005_product_version
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+
+revision = "0006_idempotency_keys"
+down_revision = "0005_product_version"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS idempotency_keys (
+            user_id varchar NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+            key varchar(255) NOT NULL,
+            fingerprint varchar(64) NOT NULL,
+            order_id varchar NOT NULL REFERENCES orders (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED,
+            created_at timestamp NOT NULL,
+            PRIMARY KEY (user_id, key)
+        )
+        """
+    )
+
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS idempotency_keys")
@@ -0,0 +1,28 @@
+"""Composite index for paginated order history
+
+Revision ID: 0007_order_history_index
+Revises: 0006_idempotency_keys
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+
+revision = "0007_order_history_index"
+down_revision = "0006_idempotency_keys"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_orders_user_created_at_id ON orders (user_id, created_at, id)"
+        )
+        # The composite index leads with user_id, so it also serves the single-column lookups
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_orders_user_id")
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_orders_user_id ON orders (user_id)")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_orders_user_created_at_id")
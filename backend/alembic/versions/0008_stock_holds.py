@@ -0,0 +1,35 @@
+"""Reserved stock counter and stock_holds table for cart reservations
+
+Revision ID: 0008_stock_holds
+Revises: 0007_order_history_index
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+
+revision = "0008_stock_holds"
+down_revision = "0007_order_history_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("ALTER TABLE products ADD COLUMN IF NOT EXISTS reserved integer NOT NULL DEFAULT 0")
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS stock_holds (
+            id varchar PRIMARY KEY,
+            owner varchar NOT NULL,
+            product_id varchar NOT NULL REFERENCES products (id) ON DELETE CASCADE,
+            quantity integer NOT NULL,
+            expires_at timestamp NOT NULL
+        )
+        """
+    )
+    op.execute("CREATE UNIQUE INDEX IF NOT EXISTS ix_stock_holds_owner_product ON stock_holds (owner, product_id)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_stock_holds_expires_at ON stock_holds (expires_at)")
+
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS stock_holds")
+    op.execute("ALTER TABLE products DROP COLUMN IF EXISTS reserved")
@@ -0,0 +1,44 @@
+"""outbox_events and outbox_checkpoints for the order and product event stream
+
+Revision ID: 0010_outbox
+Revises: 0009_sales_rollups
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+
+revision = "0010_outbox"
+down_revision = "0009_sales_rollups"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS outbox_events (
+            id bigserial PRIMARY KEY,
+            txid bigint NOT NULL DEFAULT txid_current(),
+            type varchar NOT NULL,
+            aggregate_id varchar NOT NULL,
+            payload jsonb NOT NULL,
+            created_at timestamp NOT NULL
+        )
+        """
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_outbox_events_txid_id ON outbox_events (txid, id)")
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS outbox_checkpoints (
+            sink varchar PRIMARY KEY,
+            txid bigint NOT NULL DEFAULT 0,
+            event_id bigint NOT NULL DEFAULT 0,
+            updated_at timestamp NOT NULL
+        )
+        """
+    )
+
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS outbox_checkpoints")
+    op.execute("DROP TABLE IF EXISTS outbox_events")
@@ -0,0 +1,30 @@
+"""Start the sales rollups' outbox checkpoint after the orders checkout already counted
+
+Revision ID: 0011_sales_rollup_checkpoint
+Revises: 0010_outbox
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+
+revision = "0011_sales_rollup_checkpoint"
+down_revision = "0010_outbox"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Until now checkout added each order to the rollups itself. Every transaction that could
+    # have done so has a lower txid than this one, so the sink starts with the first order
+    # placed after the migration.
+    op.execute(
+        """
+        INSERT INTO outbox_checkpoints (sink, txid, event_id, updated_at)
+        VALUES ('sales-rollups', txid_current(), 0, now())
+        ON CONFLICT (sink) DO NOTHING
+        """
+    )
+
+
+def downgrade():
+    op.execute("DELETE FROM outbox_checkpoints WHERE sink = 'sales-rollups'")
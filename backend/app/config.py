@@ -18,6 +18,46 @@ class Settings(BaseSettings):
         "http://localhost:5173",
     ]
     recommender_url: str = "http://localhost:8000"
+    product_cache_size: int = 10_000
+    product_cache_ttl_seconds: float = 60.0
+    # "sql" keeps carts in the carts table; "memory" keeps them in an in-process key-value
+    # store (single-process deployments) and also enables guest carts
+    cart_backend: str = "sql"
+    cart_ttl_seconds: int = 7 * 24 * 60 * 60
+    # Adding to the cart reserves stock for this long (0 disables holds); expired holds are
+    # released by a background sweeper in batches
+    stock_hold_ttl_seconds: int = 15 * 60
+    stock_hold_sweep_interval_seconds: float = 30.0
+    stock_hold_sweep_batch_size: int = 500
+    # "inline" places orders on the request thread; "queued" hands them to worker threads that
+    # place compatible checkouts in micro-batched transactions and returns 202 with a job to poll
+    checkout_mode: str = "inline"
+    checkout_workers: int = 4
+    checkout_batch_size: int = 32
+    checkout_batch_window_ms: float = 5.0
+    checkout_queue_size: int = 10_000
+    checkout_job_ttl_seconds: float = 600.0
+    # After this long an Idempotency-Key may be reused for a new request
+    idempotency_key_ttl_hours: int = 24
+    # bcrypt runs on its own threads (about 250 ms each); beyond max_pending running plus
+    # queued hashes, or max_per_account for one email, login and register answer 503/429 at once
+    password_hash_workers: int = 2
+    password_hash_max_pending: int = 16
+    password_hash_max_per_account: int = 2
+    password_hash_max_wait_seconds: float = 2.0
+    # Authenticated principals (decoded tokens and the user row check) are cached this long;
+    # deletes and email/role changes made through the ORM invalidate them. 0 disables the cache
+    principal_cache_size: int = 10_000
+    principal_cache_ttl_seconds: float = 30.0
+    # Order and product events are written to the outbox with each change and delivered to
+    # these sinks in batches (in-process callbacks register in code); delivered events are
+    # deleted once older than the retention period
+    outbox_file_path: str = ""
+    outbox_webhook_urls: List[str] = []
+    outbox_webhook_timeout_seconds: float = 5.0
+    outbox_batch_size: int = 500
+    outbox_poll_interval_seconds: float = 1.0
+    outbox_retention_hours: float = 72.0
     
     @validator("jwt_secret")
     def validate_jwt_secret(cls, v):
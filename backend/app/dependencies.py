@@ -1,16 +1,33 @@
-from typing import List
+import hashlib
+import time
+from typing import Any, Dict, List, Optional
+from uuid import UUID, uuid4
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, Response, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy import event, inspect
 from sqlalchemy.orm import Session
 
+from .cache import TTLCache
 from .config import get_settings
 from .database import get_db
 from .models import User
 from .security import decode_token
+from .services.cart_store import cart_store
 
 
 bearer_scheme = HTTPBearer(auto_error=True)
+optional_bearer_scheme = HTTPBearer(auto_error=False)
+
+GUEST_CART_HEADER = "X-Cart-Id"
+
+settings = get_settings()
+
+# Decoded token payloads keyed by a hash of the token, and the email on record keyed by
+# user id, so most authenticated requests cost neither a JWT verification nor a users
+# lookup. A TTL of zero disables both.
+token_cache = TTLCache(settings.principal_cache_size, settings.principal_cache_ttl_seconds)
+principal_cache = TTLCache(settings.principal_cache_size, settings.principal_cache_ttl_seconds)
 
 
 class CurrentUser:
@@ -23,13 +40,69 @@ class CurrentUser:
         return "ADMIN" in self.roles
 
 
+def invalidate_principal(user_id: str) -> None:
+    """Forget a cached user. Needed after bulk deletes or updates, which bypass the ORM events below."""
+    principal_cache.invalidate(user_id)
+
+
+def _decode(token: str) -> Dict[str, Any]:
+    key = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    payload = token_cache.get(key)
+    # A cached payload is only as good as the token's own expiry
+    if payload is not None and payload.get("exp", 0) > time.time():
+        return payload
+    payload = decode_token(token, get_settings())
+    token_cache.set(key, payload)
+    return payload
+
+
+def _email_on_record(db: Session, user_id: str) -> Optional[str]:
+    email = principal_cache.get(user_id)
+    if email is None:
+        user: User | None = db.get(User, user_id)
+        if user is None:
+            return None
+        email = user.email
+        principal_cache.set(user_id, email)
+    return email
+
+
+def _queue_principal_invalidation(target: User) -> None:
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault("stale_principals", set()).add(target.id)
+
+
+@event.listens_for(User, "after_delete")
+def _user_deleted(mapper, connection, target: User) -> None:
+    _queue_principal_invalidation(target)
+
+
+@event.listens_for(User, "after_update")
+def _user_updated(mapper, connection, target: User) -> None:
+    state = inspect(target)
+    if any(state.attrs[name].history.has_changes() for name in ("email", "roles")):
+        _queue_principal_invalidation(target)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_principals(session: Session) -> None:
+    # After the commit, so a concurrent request cannot cache the old row again in between
+    for user_id in session.info.pop("stale_principals", ()):
+        invalidate_principal(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_principal_invalidations(session: Session) -> None:
+    session.info.pop("stale_principals", None)
+
+
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
     db: Session = Depends(get_db),
 ):
-    settings = get_settings()
     token = credentials.credentials
-    payload = decode_token(token, settings)
+    payload = _decode(token)
 
     user_id: str | None = payload.get("userId")
     email: str | None = payload.get("sub")
@@ -38,14 +111,43 @@ def get_current_user(
     if not user_id or not email:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload")
 
-    user: User | None = db.get(User, user_id)
-    if user is None:
+    email_on_record = _email_on_record(db, user_id)
+    if email_on_record is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
 
-    return CurrentUser(user.id, user.email, roles)
+    return CurrentUser(user_id, email_on_record, roles)
 
 
 def require_admin(current_user: CurrentUser = Depends(get_current_user)):
     if not current_user.is_admin():
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin role required")
     return current_user
+
+
+def guest_cart_id(value: str | None) -> str | None:
+    """Normalize an X-Cart-Id value; anything but a UUID is rejected."""
+    try:
+        return str(UUID(value)) if value else None
+    except ValueError:
+        return None
+
+
+def get_cart_owner(
+    request: Request,
+    response: Response,
+    credentials: HTTPAuthorizationCredentials | None = Depends(optional_bearer_scheme),
+    db: Session = Depends(get_db),
+) -> str:
+    """Cart key for the caller: the user id when signed in, otherwise ``guest:<cart id>``.
+
+    Guests send their cart id in the X-Cart-Id header; a new one is issued in the response
+    when it is missing or malformed. Guest carts need a cart store that supports them.
+    """
+    if credentials is not None:
+        return get_current_user(credentials, db).id
+    if not cart_store.supports_guests:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authenticated")
+
+    guest_id = guest_cart_id(request.headers.get(GUEST_CART_HEADER)) or str(uuid4())
+    response.headers[GUEST_CART_HEADER] = guest_id
+    return f"guest:{guest_id}"
@@ -0,0 +1,87 @@
+import threading
+import time
+from typing import Dict, Optional
+
+
+class InMemoryKeyValueStore:
+    """Thread-safe in-process store of string hashes with per-key expiry.
+
+    It implements the small subset of Redis hash commands the app uses, with the same
+    names and return values as redis-py (``decode_responses=True``), so a Redis client
+    can be passed wherever this store is.
+    """
+
+    # Expired keys are dropped when read, and swept in full every this many writes
+    SWEEP_EVERY = 1000
+
+    def __init__(self):
+        self._hashes: Dict[str, Dict[str, str]] = {}
+        self._expires: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def hgetall(self, key: str) -> Dict[str, str]:
+        with self._lock:
+            return dict(self._live(key) or {})
+
+    def hsetnx(self, key: str, field: str, value: str) -> int:
+        with self._lock:
+            data = self._writable(key)
+            if field in data:
+                return 0
+            data[field] = str(value)
+            return 1
+
+    def hincrby(self, key: str, field: str, amount: int = 1) -> int:
+        with self._lock:
+            data = self._writable(key)
+            value = int(data.get(field, 0)) + amount
+            data[field] = str(value)
+            return value
+
+    def hdel(self, key: str, *fields: str) -> int:
+        with self._lock:
+            data = self._live(key)
+            if not data:
+                return 0
+            removed = sum(1 for field in fields if data.pop(field, None) is not None)
+            if not data:
+                self._drop(key)
+            return removed
+
+    def delete(self, *keys: str) -> int:
+        with self._lock:
+            removed = sum(1 for key in keys if self._live(key) is not None)
+            for key in keys:
+                self._drop(key)
+            return removed
+
+    def expire(self, key: str, seconds: float) -> bool:
+        with self._lock:
+            if self._live(key) is None:
+                return False
+            self._expires[key] = time.monotonic() + seconds
+            return True
+
+    # The helpers below expect the lock to be held.
+
+    def _live(self, key: str) -> Optional[Dict[str, str]]:
+        deadline = self._expires.get(key)
+        if deadline is not None and deadline <= time.monotonic():
+            self._drop(key)
+        return self._hashes.get(key)
+
+    def _writable(self, key: str) -> Dict[str, str]:
+        self._writes += 1
+        if self._writes % self.SWEEP_EVERY == 0:
+            now = time.monotonic()
+            for expired in [name for name, deadline in self._expires.items() if deadline <= now]:
+                self._drop(expired)
+        data = self._live(key)
+        if data is None:
+            data = self._hashes[key] = {}
+        return data
+
+    def _drop(self, key: str) -> None:
+        self._hashes.pop(key, None)
+        self._expires.pop(key, None)
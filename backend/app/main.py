@@ -2,8 +2,18 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from .config import get_settings
-from .database import Base, engine
-from .routers import auth_router, cart_router, orders_router, products_router, recommendations_router
+from .dependencies import GUEST_CART_HEADER
+from .database import Base, SessionLocal, engine
+from .routers import auth_router, cart_router, orders_router, products_router, recommendations_router, reports_router
+from .security import password_hasher
+from .services import (
+    checkout_queue,
+    hold_sweeper,
+    holds_enabled,
+    outbox_dispatcher,
+    queued_checkout_enabled,
+    rebuild_suggest_index,
+)
 from . import models  # noqa: F401 ensures models are registered
 
 settings = get_settings()
@@ -16,12 +26,31 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[GUEST_CART_HEADER],
 )
 
 
 @app.on_event("startup")
 def on_startup():
     Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        rebuild_suggest_index(db)
+    finally:
+        db.close()
+    if holds_enabled():
+        hold_sweeper.start()
+    if queued_checkout_enabled():
+        checkout_queue.start()
+    outbox_dispatcher.start()
+
+
+@app.on_event("shutdown")
+def on_shutdown():
+    hold_sweeper.stop()
+    checkout_queue.stop()
+    outbox_dispatcher.stop()
+    password_hasher.shutdown()
 
 
 @app.get("/api/health")
@@ -34,3 +63,4 @@ app.include_router(products_router, prefix="/api")
 app.include_router(cart_router, prefix="/api")
 app.include_router(orders_router, prefix="/api")
 app.include_router(recommendations_router, prefix="/api")
+app.include_router(reports_router, prefix="/api")
@@ -1,12 +1,21 @@
 from .user import User
 from .product import Product
-from .order import Order, OrderItem
+from .order import IdempotencyKey, Order, OrderItem
 from .cart import CartItem
+from .inventory import StockHold
+from .outbox import OutboxCheckpoint, OutboxEvent
+from .sales import CategorySalesDaily, ProductSalesDaily
 
 __all__ = [
     "User",
     "Product",
     "Order",
     "OrderItem",
+    "IdempotencyKey",
     "CartItem",
+    "StockHold",
+    "OutboxEvent",
+    "OutboxCheckpoint",
+    "ProductSalesDaily",
+    "CategorySalesDaily",
 ]
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from uuid import uuid4
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String
+
+from ..database import Base
+
+
+class StockHold(Base):
+    """Units of a product reserved for one cart until ``expires_at``.
+
+    ``owner`` is the cart owner key (a user id or ``guest:<id>``), so it has no foreign key.
+    """
+
+    __tablename__ = "stock_holds"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid4()))
+    owner = Column(String, nullable=False)
+    product_id = Column(String, ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
+    quantity = Column(Integer, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        # One hold per cart line, so adding more of a product tops up and extends the same hold
+        Index("ix_stock_holds_owner_product", "owner", "product_id", unique=True),
+        # The sweeper walks holds in expiry order
+        Index("ix_stock_holds_expires_at", "expires_at"),
+    )
@@ -4,7 +4,7 @@ from datetime import datetime, timezone
 from decimal import Decimal
 from uuid import uuid4
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, Numeric, String
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, Numeric, String
 from sqlalchemy.orm import relationship
 
 from ..database import Base
@@ -14,13 +14,18 @@ class Order(Base):
     __tablename__ = "orders"
 
     id = Column(String, primary_key=True, default=lambda: str(uuid4()))
-    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     status = Column(String, nullable=False, default="placed")
     total = Column(Numeric(12, 2), nullable=False)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
 
     items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Serves a user's order history newest first, and keyset cursors over it
+        Index("ix_orders_user_created_at_id", "user_id", "created_at", "id"),
+    )
+
 
 class OrderItem(Base):
     __tablename__ = "order_items"
@@ -33,3 +38,21 @@ class OrderItem(Base):
 
     order = relationship("Order", back_populates="items")
 
+
+
+class IdempotencyKey(Base):
+    """A client-supplied Idempotency-Key and the order its first request created."""
+
+    __tablename__ = "idempotency_keys"
+
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    # Hash of the request the key was first used with; reuse with another request is rejected
+    fingerprint = Column(String(64), nullable=False)
+    # The key row is written before the order in the same transaction, so the check waits for commit
+    order_id = Column(
+        String,
+        ForeignKey("orders.id", ondelete="CASCADE", deferrable=True, initially="DEFERRED"),
+        nullable=False,
+    )
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
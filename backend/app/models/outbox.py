@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from sqlalchemy import BigInteger, Column, DateTime, Index, String, text
+from sqlalchemy.dialects.postgresql import JSONB
+
+from ..database import Base
+
+
+class OutboxEvent(Base):
+    """A domain event written in the same transaction as the change it describes.
+
+    ``txid`` is the writing transaction's id. Dispatchers read in (txid, id) order and only
+    past transactions that can no longer commit, so a slow transaction's events are never
+    skipped the way a cursor on ``id`` alone would skip them.
+    """
+
+    __tablename__ = "outbox_events"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    txid = Column(BigInteger, nullable=False, server_default=text("txid_current()"))
+    type = Column(String, nullable=False)
+    aggregate_id = Column(String, nullable=False)
+    payload = Column(JSONB, nullable=False)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+
+    __table_args__ = (
+        # The dispatch cursor seeks on (txid, id)
+        Index("ix_outbox_events_txid_id", "txid", "id"),
+    )
+
+
+class OutboxCheckpoint(Base):
+    """How far one sink has been delivered: the (txid, id) of the last event it acknowledged."""
+
+    __tablename__ = "outbox_checkpoints"
+
+    sink = Column(String, primary_key=True)
+    txid = Column(BigInteger, nullable=False, default=0)
+    event_id = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
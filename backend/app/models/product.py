@@ -1,24 +1,65 @@
 from __future__ import annotations
 
+from datetime import datetime, timezone
 from decimal import Decimal
 from typing import List
 from uuid import uuid4
 
-from sqlalchemy import Column, Integer, Numeric, String
-from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+from sqlalchemy import Column, Computed, DateTime, Index, Integer, Numeric, String, func
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, TSVECTOR
+from sqlalchemy.orm import deferred
 
 from ..database import Base
 
+# Keep in sync with the search_vector migration; queries must use the same text search config.
+SEARCH_CONFIG = "english"
+SEARCH_VECTOR_SQL = (
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(name, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')"
+)
+
 
 class Product(Base):
     __tablename__ = "products"
 
     id = Column(String, primary_key=True, default=lambda: str(uuid4()))
-    name = Column(String, nullable=False, index=True)
+    name = Column(String, nullable=False)
     description = Column(String, nullable=True)
-    categories = Column(ARRAY(String), nullable=False, default=list, index=True)
+    categories = Column(ARRAY(String), nullable=False, default=list)
     price = Column(Numeric(12, 2), nullable=False)
     images = Column(ARRAY(String), nullable=False, default=list)
     stock = Column(Integer, nullable=False, default=0)
+    # Units held by active cart reservations (stock_holds); maintained alongside the holds
+    reserved = Column(Integer, nullable=False, default=0, server_default="0")
     attributes = Column(JSONB, nullable=False, default=dict)
+    # Bumped by every write; PATCH callers send it back for compare-and-swap updates
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    created_at = Column(
+        DateTime,
+        default=lambda: datetime.now(timezone.utc),
+        server_default=func.now(),
+        nullable=False,
+    )
+    # Generated by Postgres from name/description; deferred so listings never ship it.
+    search_vector = deferred(Column(TSVECTOR, Computed(SEARCH_VECTOR_SQL, persisted=True)))
+
+    __table_args__ = (
+        # One composite index per listing sort; the trailing id makes each order total
+        Index("ix_products_price_id", "price", "id"),
+        Index("ix_products_name_id", "name", "id"),
+        Index("ix_products_created_at_id", "created_at", "id"),
+        Index("ix_products_search_vector", "search_vector", postgresql_using="gin"),
+        # Serves `categories @> ARRAY[...]`; a btree on an array column cannot
+        Index("ix_products_categories_gin", "categories", postgresql_using="gin"),
+        # jsonb_path_ops only supports @>, which is all attribute filtering uses, and is smaller
+        Index(
+            "ix_products_attributes",
+            "attributes",
+            postgresql_using="gin",
+            postgresql_ops={"attributes": "jsonb_path_ops"},
+        ),
+    )
 
+    @property
+    def available(self) -> int:
+        return max((self.stock or 0) - (self.reserved or 0), 0)
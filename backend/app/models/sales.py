@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from sqlalchemy import Column, Date, Integer, Numeric, String
+
+from ..database import Base
+
+
+class ProductSalesDaily(Base):
+    """Units, revenue and order count per product per UTC day, kept up to date by checkout.
+
+    ``product_id`` has no foreign key so sales history outlives deleted products.
+    """
+
+    __tablename__ = "product_sales_daily"
+
+    day = Column(Date, primary_key=True)
+    product_id = Column(String, primary_key=True)
+    units = Column(Integer, nullable=False, default=0)
+    revenue = Column(Numeric(14, 2), nullable=False, default=0)
+    orders = Column(Integer, nullable=False, default=0)
+
+
+class CategorySalesDaily(Base):
+    """The same totals per category per UTC day; a product in several categories counts in each."""
+
+    __tablename__ = "category_sales_daily"
+
+    day = Column(Date, primary_key=True)
+    category = Column(String, primary_key=True)
+    units = Column(Integer, nullable=False, default=0)
+    revenue = Column(Numeric(14, 2), nullable=False, default=0)
+    orders = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,58 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, List, Sequence
+
+from sqlalchemy import literal, tuple_
+from sqlalchemy.sql.elements import ColumnElement
+
+
+def encode_cursor(scope: str, values: Sequence[Any]) -> str:
+    """Build an opaque cursor from the sort key of the last row on a page."""
+    payload = {"s": scope, "k": [_dump(value) for value in values]}
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, scope: str, columns: Sequence[Any]) -> List[Any]:
+    """Decode a cursor produced by ``encode_cursor`` for the same scope and columns.
+
+    Raises ``ValueError`` when the cursor is malformed or was issued for a different sort.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        values = payload["k"]
+        if payload["s"] != scope or len(values) != len(columns):
+            raise ValueError("Invalid cursor")
+        return [_load(column, value) for column, value in zip(columns, values)]
+    except (binascii.Error, UnicodeDecodeError, KeyError, TypeError, ArithmeticError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def keyset_after(columns: Sequence[Any], values: Sequence[Any], descending: bool = False) -> ColumnElement:
+    """WHERE clause seeking past ``values`` on a row-value comparison of ``columns``."""
+    key = tuple_(*columns)
+    boundary = tuple_(*(literal(value, column.type) for column, value in zip(columns, values)))
+    return key < boundary if descending else key > boundary
+
+
+def _dump(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _load(column: Any, value: Any) -> Any:
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if python_type is Decimal:
+        return Decimal(value)
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    return python_type(value)
@@ -3,6 +3,7 @@ from .products import router as products_router
 from .cart import router as cart_router
 from .orders import router as orders_router
 from .recommendations import router as recommendations_router
+from .reports import router as reports_router
 
 __all__ = [
     "auth_router",
@@ -10,4 +11,5 @@ __all__ = [
     "cart_router",
     "orders_router",
     "recommendations_router",
+    "reports_router",
 ]
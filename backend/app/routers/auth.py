@@ -3,19 +3,27 @@ from sqlalchemy.orm import Session
 
 from ..config import get_settings
 from ..database import get_db
+from ..dependencies import CurrentUser, require_admin
 from ..schemas import AuthResponse, LoginRequest, RegisterRequest
+from ..security import password_hasher
 from ..services import login, register
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
 @router.post("/register", response_model=AuthResponse)
-def register_user(request: RegisterRequest, db: Session = Depends(get_db)):
+async def register_user(request: RegisterRequest, db: Session = Depends(get_db)):
     settings = get_settings()
-    return register(db, settings, request)
+    return await register(db, settings, request)
 
 
 @router.post("/login", response_model=AuthResponse)
-def login_user(request: LoginRequest, db: Session = Depends(get_db)):
+async def login_user(request: LoginRequest, db: Session = Depends(get_db)):
     settings = get_settings()
-    return login(db, settings, request)
+    return await login(db, settings, request)
+
+
+@router.get("/hasher/stats")
+def password_hasher_stats(_: CurrentUser = Depends(require_admin)):
+    # Queue depth, rejections and bcrypt latency of the password hashing pool
+    return password_hasher.stats()
@@ -1,10 +1,20 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, HTTPException, status
 from sqlalchemy.orm import Session
 
 from ..database import get_db
-from ..dependencies import CurrentUser, get_current_user
-from ..schemas import CartItemCreate, CartItemRead
-from ..services import add_to_cart, cart_total, clear_cart, get_cart, remove_from_cart
+from ..dependencies import GUEST_CART_HEADER, CurrentUser, get_cart_owner, get_current_user, guest_cart_id
+from ..schemas import CartItemCreate, CartItemRead, CartItemsCreate, CartSummary
+from ..services import (
+    MAX_CART_ITEMS_PER_REQUEST,
+    add_items_to_cart,
+    add_to_cart,
+    cart_summary,
+    cart_total,
+    claim_guest_cart,
+    clear_cart,
+    get_cart,
+    remove_from_cart,
+)
 
 router = APIRouter(prefix="/cart", tags=["cart"])
 
@@ -13,42 +23,77 @@ router = APIRouter(prefix="/cart", tags=["cart"])
 def add_item(
     payload: CartItemCreate,
     db: Session = Depends(get_db),
-    current_user: CurrentUser = Depends(get_current_user),
+    owner: str = Depends(get_cart_owner),
+):
+    return add_to_cart(db, owner, payload.productId, payload.quantity)
+
+
+@router.post("/items", response_model=list[CartItemRead])
+def add_items(
+    payload: CartItemsCreate,
+    db: Session = Depends(get_db),
+    owner: str = Depends(get_cart_owner),
 ):
-    return add_to_cart(db, current_user.id, payload.productId, payload.quantity)
+    if len(payload.items) > MAX_CART_ITEMS_PER_REQUEST:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_CART_ITEMS_PER_REQUEST} items per request",
+        )
+    return add_items_to_cart(db, owner, [(item.productId, item.quantity) for item in payload.items])
 
 
 @router.get("", response_model=list[CartItemRead])
 def get_user_cart(
     db: Session = Depends(get_db),
-    current_user: CurrentUser = Depends(get_current_user),
+    owner: str = Depends(get_cart_owner),
 ):
-    return get_cart(db, current_user.id)
+    return get_cart(db, owner)
 
 
 @router.get("/total")
 def get_cart_total(
     db: Session = Depends(get_db),
-    current_user: CurrentUser = Depends(get_current_user),
+    owner: str = Depends(get_cart_owner),
 ):
-    total = cart_total(db, current_user.id)
+    total = cart_total(db, owner)
     return {"total": float(total)}
 
 
+@router.get("/summary", response_model=CartSummary)
+def get_user_cart_summary(
+    db: Session = Depends(get_db),
+    owner: str = Depends(get_cart_owner),
+):
+    return cart_summary(db, owner)
+
+
 @router.delete("/{product_id}")
 def delete_item(
     product_id: str,
     db: Session = Depends(get_db),
-    current_user: CurrentUser = Depends(get_current_user),
+    owner: str = Depends(get_cart_owner),
 ):
-    remove_from_cart(db, current_user.id, product_id)
+    remove_from_cart(db, owner, product_id)
     return {"status": "removed"}
 
 
 @router.delete("")
 def clear_user_cart(
     db: Session = Depends(get_db),
-    current_user: CurrentUser = Depends(get_current_user),
+    owner: str = Depends(get_cart_owner),
 ):
-    clear_cart(db, current_user.id)
+    clear_cart(db, owner)
     return {"status": "cleared"}
+
+
+@router.post("/claim", response_model=list[CartItemRead])
+def claim_cart(
+    cart_id: str | None = Header(None, alias=GUEST_CART_HEADER),
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    # Called after sign-in to carry the guest cart over to the account
+    guest_id = guest_cart_id(cart_id)
+    if guest_id is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"{GUEST_CART_HEADER} header required")
+    return claim_guest_cart(db, f"guest:{guest_id}", current_user.id)
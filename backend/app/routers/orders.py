@@ -1,31 +1,94 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
 
 from ..database import get_db
 from ..dependencies import CurrentUser, get_current_user
-from ..schemas import OrderRead
-from ..services import create_order, get_order, get_user_orders
+from ..schemas import CheckoutJobRead, OrderPage, OrderRead, OrderSummaryRead
+from ..services import (
+    IDEMPOTENCY_KEY_MAX_LENGTH,
+    checkout_queue,
+    create_order,
+    get_order,
+    get_user_orders,
+    get_user_orders_page,
+    queued_checkout_enabled,
+    request_fingerprint,
+)
+
+MAX_CHECKOUT_WAIT_SECONDS = 10
 
 router = APIRouter(prefix="/orders", tags=["orders"])
 
 
-@router.post("", response_model=OrderRead)
+@router.post("", response_model=OrderRead | CheckoutJobRead)
 def create_order_route(
+    request: Request,
+    response: Response,
+    idempotency_key: str | None = Header(None),
     db: Session = Depends(get_db),
     current_user: CurrentUser = Depends(get_current_user),
 ):
-    return create_order(db, current_user.id)
+    # Clients send a fresh Idempotency-Key per checkout attempt and reuse it on retries
+    if idempotency_key is not None and not 0 < len(idempotency_key) <= IDEMPOTENCY_KEY_MAX_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Idempotency-Key must be 1 to {IDEMPOTENCY_KEY_MAX_LENGTH} characters",
+        )
+
+    # The request has no body, so the user and route are all a key can be checked against
+    fingerprint = request_fingerprint(current_user.id, request.method, request.url.path)
+
+    # In queued mode the checkout is accepted now and placed by a worker; poll the job for the order
+    if queued_checkout_enabled():
+        job = checkout_queue.submit(current_user.id, idempotency_key, fingerprint)
+        response.status_code = status.HTTP_202_ACCEPTED
+        response.headers["Location"] = f"{request.url.path}/checkout/{job.id}"
+        return CheckoutJobRead.model_validate(job)
 
+    return create_order(db, current_user.id, idempotency_key, fingerprint)
 
-@router.get("/{user_id}", response_model=list[OrderRead])
+
+@router.get("/checkout/{job_id}", response_model=CheckoutJobRead)
+async def get_checkout_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, le=MAX_CHECKOUT_WAIT_SECONDS),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    job = checkout_queue.get(job_id)
+    if job is None or job.user_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Checkout not found")
+    # Long-poll: hold the request until the job finishes or `wait` seconds pass. It awaits
+    # on the event loop, so waiting requests do not tie up threadpool threads
+    if wait:
+        await job.wait(wait)
+    return CheckoutJobRead.model_validate(job)
+
+
+@router.get("/{user_id}", response_model=list[OrderRead] | list[OrderSummaryRead] | OrderPage)
 def list_user_orders(
     user_id: str,
+    size: int = Query(20, ge=1, le=100),
+    cursor: str | None = None,
+    summary: bool = False,
     db: Session = Depends(get_db),
     current_user: CurrentUser = Depends(get_current_user),
 ):
     if current_user.id != user_id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
-    return get_user_orders(db, user_id)
+
+    # Summaries are built explicitly so serialization never touches the unloaded line items
+    schema = OrderSummaryRead if summary else OrderRead
+
+    # Passing `cursor` (empty for the first page) switches to pages of `size` orders;
+    # without it the full history is returned as before.
+    if cursor is not None:
+        try:
+            orders, next_cursor = get_user_orders_page(db, user_id, size, cursor or None, summary)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        return OrderPage(items=[schema.model_validate(order) for order in orders], next_cursor=next_cursor)
+
+    return [schema.model_validate(order) for order in get_user_orders(db, user_id, summary)]
 
 
 @router.get("/order/{order_id}", response_model=OrderRead)
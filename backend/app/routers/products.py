@@ -1,31 +1,220 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import io
+import zlib
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List, Sequence
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile, status
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 
 from ..database import get_db
 from ..dependencies import CurrentUser, require_admin
 from ..models import Product
-from ..schemas import ProductCreate, ProductRead, ProductUpdate
-from ..services import create_product, delete_product, get_product, get_products, update_product
+from ..schemas import (
+    ProductBatch,
+    ProductCreate,
+    ProductFacets,
+    ProductImportReport,
+    ProductPage,
+    ProductPatch,
+    ProductRead,
+    ProductSuggestion,
+    ProductUpdate,
+    StockSyncReport,
+    StockSyncRequest,
+)
+from ..services import (
+    MAX_BATCH_IDS,
+    MAX_STOCK_SYNC_ITEMS,
+    SORT_KEYS,
+    ProductFilters,
+    VersionConflictError,
+    create_product,
+    delete_product,
+    detect_import_format,
+    export_products,
+    get_facets,
+    get_product,
+    get_products,
+    get_products_by_ids,
+    get_products_page,
+    import_products,
+    parse_fields,
+    patch_product,
+    product_cache,
+    suggest,
+    sync_stock,
+    update_product,
+)
 
 router = APIRouter(prefix="/products", tags=["products"])
 
+ATTRIBUTE_PREFIX = "attr."
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _fieldset(fields: str | None):
+    try:
+        return parse_fields(fields)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+
+def _product_filters(
+    request: Request,
+    category: str | None = None,
+    q: str | None = None,
+    min_price: Decimal | None = Query(None, ge=0),
+    max_price: Decimal | None = Query(None, ge=0),
+) -> ProductFilters:
+    # Attribute filters arrive as free-form `attr.<key>=<value>` query parameters
+    attributes: Dict[str, List[str]] = {}
+    for name, value in request.query_params.multi_items():
+        if name.startswith(ATTRIBUTE_PREFIX) and len(name) > len(ATTRIBUTE_PREFIX):
+            attributes.setdefault(name[len(ATTRIBUTE_PREFIX):], []).append(value)
+    return ProductFilters(
+        category=category,
+        search=q,
+        attributes=attributes,
+        min_price=min_price,
+        max_price=max_price,
+    )
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """Whether an Accept-Encoding header allows gzip, honouring q-values (``gzip;q=0`` refuses it)."""
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, *params = (part.strip() for part in item.split(";"))
+        coding = coding.lower()
+        if coding == "x-gzip":
+            coding = "gzip"
+        weight = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        if coding:
+            weights[coding] = weight
+    # An explicit gzip entry wins over the "*" wildcard
+    return weights.get("gzip", weights.get("*", 0.0)) > 0
+
+
+def _gzip(chunks: Iterator[str]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def _sparse(product: Product, fields: Sequence[str]) -> Dict[str, Any]:
+    # Serialize only the requested columns; the others were never loaded
+    data = {field: getattr(product, field) for field in fields}
+    if isinstance(data.get("price"), Decimal):
+        data["price"] = float(data["price"])
+    return data
 
-@router.get("", response_model=list[ProductRead])
+
+@router.get("", response_model=list[ProductRead] | ProductPage)
 def list_products(
     page: int = 0,
     size: int = 100,
-    category: str | None = None,
-    q: str | None = None,
+    cursor: str | None = None,
+    fields: str | None = None,
+    sort: str | None = None,
+    filters: ProductFilters = Depends(_product_filters),
+    db: Session = Depends(get_db),
+):
+    fieldset = _fieldset(fields)
+    if sort is not None and sort not in SORT_KEYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"sort must be one of: {', '.join(SORT_KEYS)}",
+        )
+
+    # Passing `cursor` (empty for the first page) switches to keyset pagination;
+    # `page`/`size` offset paging is kept for older clients.
+    if cursor is not None:
+        try:
+            items, next_cursor = get_products_page(db, size, filters, cursor or None, fieldset, sort)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        if fieldset:
+            return JSONResponse({"items": [_sparse(p, fieldset) for p in items], "next_cursor": next_cursor})
+        return ProductPage(items=items, next_cursor=next_cursor)
+
+    products = get_products(db, page, size, filters, fieldset, sort)
+    if fieldset:
+        return JSONResponse([_sparse(p, fieldset) for p in products])
+    return products
+
+
+@router.get("/suggest", response_model=list[ProductSuggestion])
+def suggest_products(prefix: str, limit: int = Query(10, ge=1, le=50)):
+    # Served entirely from the in-memory prefix index; no database session needed
+    return suggest(prefix, limit)
+
+
+@router.get("/facets", response_model=ProductFacets)
+def list_product_facets(
+    filters: ProductFilters = Depends(_product_filters),
     db: Session = Depends(get_db),
 ):
-    return get_products(db, page, size, category, q)
+    return get_facets(db, filters)
+
+
+@router.get("/batch", response_model=ProductBatch)
+def get_products_batch(ids: list[str] = Query(...), db: Session = Depends(get_db)):
+    # Accept both ?ids=a&ids=b and ?ids=a,b
+    product_ids = [part.strip() for value in ids for part in value.split(",") if part.strip()]
+    if len(product_ids) > MAX_BATCH_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_BATCH_IDS} ids per request",
+        )
+    items, missing = get_products_by_ids(db, product_ids)
+    return ProductBatch(items=items, missing=missing)
+
+
+@router.get("/export")
+def export_products_route(
+    request: Request,
+    format: str = "ndjson",
+    _: CurrentUser = Depends(require_admin),
+):
+    try:
+        chunks = export_products(format)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+    headers = {
+        "Content-Disposition": f'attachment; filename="products.{format}"',
+        "Vary": "Accept-Encoding",
+    }
+    if _accepts_gzip(request.headers.get("accept-encoding", "")):
+        headers["Content-Encoding"] = "gzip"
+        return StreamingResponse(_gzip(chunks), media_type=EXPORT_MEDIA_TYPES[format], headers=headers)
+    return StreamingResponse(chunks, media_type=EXPORT_MEDIA_TYPES[format], headers=headers)
+
+
+@router.get("/cache/stats")
+def product_cache_stats(_: CurrentUser = Depends(require_admin)):
+    return product_cache.stats()
 
 
 @router.get("/{product_id}", response_model=ProductRead)
-def get_product_by_id(product_id: str, db: Session = Depends(get_db)):
+def get_product_by_id(product_id: str, fields: str | None = None, db: Session = Depends(get_db)):
+    fieldset = _fieldset(fields)
     product = get_product(db, product_id)
     if not product:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
+    if fieldset:
+        return JSONResponse(_sparse(product, fieldset))
     return product
 
 
@@ -39,6 +228,35 @@ def create_product_route(
     return create_product(db, product)
 
 
+@router.post("/import", response_model=ProductImportReport)
+def import_products_route(
+    file: UploadFile = File(...),
+    format: str | None = None,
+    db: Session = Depends(get_db),
+    _: CurrentUser = Depends(require_admin),
+):
+    # The upload is spooled to disk by Starlette, so reading it line by line keeps memory flat
+    stream = io.TextIOWrapper(file.file, encoding="utf-8", newline="")
+    try:
+        return import_products(db, stream, format or detect_import_format(file.filename))
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+
+@router.post("/stock", response_model=StockSyncReport)
+def sync_stock_route(
+    payload: StockSyncRequest,
+    db: Session = Depends(get_db),
+    _: CurrentUser = Depends(require_admin),
+):
+    if len(payload.items) > MAX_STOCK_SYNC_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_STOCK_SYNC_ITEMS} items per request",
+        )
+    return sync_stock(db, payload.items)
+
+
 @router.put("/{product_id}", response_model=ProductRead)
 def update_product_route(
     product_id: str,
@@ -53,6 +271,26 @@ def update_product_route(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
 
 
+@router.patch("/{product_id}", response_model=ProductRead)
+def patch_product_route(
+    product_id: str,
+    payload: ProductPatch,
+    db: Session = Depends(get_db),
+    _: CurrentUser = Depends(require_admin),
+):
+    changes = payload.model_dump(exclude_unset=True)
+    expected_version = changes.pop("version", None)
+    try:
+        return patch_product(db, product_id, changes, expected_version)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
+    except VersionConflictError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Product was modified by another request; reload it and retry",
+        )
+
+
 @router.delete("/{product_id}")
 def delete_product_route(
     product_id: str,
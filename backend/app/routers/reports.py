@@ -0,0 +1,57 @@
+from datetime import date, datetime, timedelta, timezone
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from ..database import get_db
+from ..dependencies import CurrentUser, require_admin
+from ..schemas import CategoryRevenueRead, TopSellerRead
+from ..services import MAX_REPORT_ROWS, REPORT_METRICS, revenue_by_category, top_sellers
+
+DEFAULT_REPORT_DAYS = 30
+MAX_REPORT_DAYS = 366
+
+router = APIRouter(prefix="/reports", tags=["reports"])
+
+
+def _date_range(start: date | None, end: date | None):
+    # Days are UTC; both ends are inclusive and default to the last DEFAULT_REPORT_DAYS days
+    end = end or datetime.now(timezone.utc).date()
+    start = start or end - timedelta(days=DEFAULT_REPORT_DAYS - 1)
+    if start > end:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start must not be after end")
+    if (end - start).days >= MAX_REPORT_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Reports cover at most {MAX_REPORT_DAYS} days",
+        )
+    return start, end
+
+
+@router.get("/top-sellers", response_model=list[TopSellerRead])
+def top_sellers_report(
+    start: date | None = None,
+    end: date | None = None,
+    limit: int = Query(10, ge=1, le=MAX_REPORT_ROWS),
+    by: str = "units",
+    db: Session = Depends(get_db),
+    _: CurrentUser = Depends(require_admin),
+):
+    if by not in REPORT_METRICS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"by must be one of: {', '.join(REPORT_METRICS)}",
+        )
+    start, end = _date_range(start, end)
+    return top_sellers(db, start, end, limit, by)
+
+
+@router.get("/revenue-by-category", response_model=list[CategoryRevenueRead])
+def revenue_by_category_report(
+    start: date | None = None,
+    end: date | None = None,
+    db: Session = Depends(get_db),
+    _: CurrentUser = Depends(require_admin),
+):
+    start, end = _date_range(start, end)
+    return revenue_by_category(db, start, end)
@@ -1,19 +1,58 @@
 from .auth import AuthResponse, LoginRequest, RegisterRequest
-from .product import ProductCreate, ProductRead, ProductUpdate
-from .cart import CartItemCreate, CartItemRead
-from .order import OrderItemRead, OrderRead
+from .product import (
+    CategoryFacet,
+    PriceRangeFacet,
+    ProductBatch,
+    ProductCreate,
+    ProductFacets,
+    ProductImportError,
+    ProductImportReport,
+    ProductImportRow,
+    ProductPage,
+    ProductPatch,
+    ProductRead,
+    ProductSuggestion,
+    ProductUpdate,
+    StockSyncItem,
+    StockSyncReport,
+    StockSyncRequest,
+)
+from .cart import CartItemCreate, CartItemRead, CartItemsCreate, CartStockWarning, CartSummary
+from .order import CheckoutJobRead, OrderItemRead, OrderPage, OrderRead, OrderSummaryRead
+from .report import CategoryRevenueRead, TopSellerRead
 from .user import UserRead
 
 __all__ = [
     "AuthResponse",
     "LoginRequest",
     "RegisterRequest",
+    "ProductBatch",
+    "CategoryFacet",
+    "PriceRangeFacet",
     "ProductCreate",
+    "ProductFacets",
+    "ProductImportError",
+    "ProductImportReport",
+    "ProductImportRow",
+    "ProductPage",
+    "ProductPatch",
     "ProductRead",
+    "ProductSuggestion",
     "ProductUpdate",
+    "StockSyncItem",
+    "StockSyncReport",
+    "StockSyncRequest",
     "CartItemCreate",
     "CartItemRead",
+    "CartItemsCreate",
+    "CartStockWarning",
+    "CartSummary",
+    "CheckoutJobRead",
     "OrderItemRead",
+    "OrderPage",
     "OrderRead",
+    "OrderSummaryRead",
+    "CategoryRevenueRead",
+    "TopSellerRead",
     "UserRead",
 ]
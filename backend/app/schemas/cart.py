@@ -1,4 +1,5 @@
 from decimal import Decimal
+from typing import List
 
 from pydantic import BaseModel, Field
 
@@ -8,6 +9,10 @@ class CartItemCreate(BaseModel):
     quantity: int = Field(gt=0)
 
 
+class CartItemsCreate(BaseModel):
+    items: List[CartItemCreate] = Field(min_length=1)
+
+
 class CartItemRead(BaseModel):
     id: str
     userId: str = Field(alias="user_id")
@@ -21,3 +26,22 @@ class CartItemRead(BaseModel):
         json_encoders = {
             Decimal: lambda v: float(v),
         }
+
+
+class CartStockWarning(BaseModel):
+    productId: str
+    requested: int
+    available: int
+
+
+class CartSummary(BaseModel):
+    items: List[CartItemRead]
+    # Total units across all lines
+    itemCount: int
+    subtotal: Decimal
+    warnings: List[CartStockWarning] = Field(default_factory=list)
+
+    class Config:
+        json_encoders = {
+            Decimal: lambda v: float(v),
+        }
@@ -1,6 +1,6 @@
 from datetime import datetime
 from decimal import Decimal
-from typing import List
+from typing import List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -18,10 +18,9 @@ class OrderItemRead(BaseModel):
         }
 
 
-class OrderRead(BaseModel):
+class OrderSummaryRead(BaseModel):
     id: str
     userId: str = Field(alias="user_id")
-    items: List[OrderItemRead]
     status: str
     total: Decimal
     createdAt: datetime = Field(alias="created_at")
@@ -32,3 +31,24 @@ class OrderRead(BaseModel):
         json_encoders = {
             Decimal: lambda v: float(v),
         }
+
+
+class OrderRead(OrderSummaryRead):
+    items: List[OrderItemRead]
+
+
+class OrderPage(BaseModel):
+    items: List[OrderRead] | List[OrderSummaryRead]
+    next_cursor: Optional[str] = None
+
+
+class CheckoutJobRead(BaseModel):
+    jobId: str = Field(alias="id")
+    status: str
+    orderId: Optional[str] = Field(None, alias="order_id")
+    order: Optional[OrderRead] = None
+    error: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+        populate_by_name = True
@@ -1,7 +1,7 @@
 from decimal import Decimal
 from typing import Any, Dict, List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator, validator
 
 
 class ProductBase(BaseModel):
@@ -22,11 +22,116 @@ class ProductUpdate(ProductBase):
     pass
 
 
+class ProductPatch(BaseModel):
+    # Only fields present in the request body are written
+    name: Optional[str] = None
+    description: Optional[str] = None
+    categories: Optional[List[str]] = None
+    price: Optional[Decimal] = None
+    images: Optional[List[str]] = None
+    stock: Optional[int] = None
+    attributes: Optional[Dict[str, Any]] = None
+    # When given, the update only applies if the product is still at this version
+    version: Optional[int] = None
+
+    @validator("name", "categories", "price", "images", "stock", "attributes")
+    def not_null(cls, v):
+        if v is None:
+            raise ValueError("may not be null")
+        return v
+
+
+class ProductImportRow(ProductCreate):
+    # Rows carrying an id upsert that product; rows without one are inserted.
+    id: Optional[str] = None
+
+
 class ProductRead(ProductBase):
     id: str
+    version: int = 1
+    # Stock minus units held in carts
+    available: Optional[int] = None
 
     class Config:
         from_attributes = True
         json_encoders = {
             Decimal: lambda v: float(v),
         }
+
+
+class ProductPage(BaseModel):
+    items: List[ProductRead]
+    next_cursor: Optional[str] = None
+
+
+class ProductBatch(BaseModel):
+    items: List[ProductRead]
+    missing: List[str] = Field(default_factory=list)
+
+
+class CategoryFacet(BaseModel):
+    name: str
+    count: int
+
+
+class PriceRangeFacet(BaseModel):
+    min: Decimal
+    max: Optional[Decimal] = None
+    count: int
+
+    class Config:
+        json_encoders = {
+            Decimal: lambda v: float(v),
+        }
+
+
+class ProductFacets(BaseModel):
+    total: int
+    in_stock: int
+    categories: List[CategoryFacet]
+    price_ranges: List[PriceRangeFacet]
+
+
+class ProductSuggestion(BaseModel):
+    text: str
+    type: str
+    product_id: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
+class ProductImportError(BaseModel):
+    line: int
+    error: str
+
+
+class ProductImportReport(BaseModel):
+    processed: int = 0
+    imported: int = 0
+    errors: List[ProductImportError] = Field(default_factory=list)
+
+
+class StockSyncItem(BaseModel):
+    # Exactly one of `stock` (absolute level) or `delta` (relative change)
+    product_id: str
+    stock: Optional[int] = Field(None, ge=0)
+    delta: Optional[int] = None
+
+    @model_validator(mode="after")
+    def one_of_stock_or_delta(self):
+        if (self.stock is None) == (self.delta is None):
+            raise ValueError("provide exactly one of stock or delta")
+        return self
+
+
+class StockSyncRequest(BaseModel):
+    items: List[StockSyncItem]
+
+
+class StockSyncReport(BaseModel):
+    # New stock level per updated product id
+    updated: Dict[str, int] = Field(default_factory=dict)
+    missing: List[str] = Field(default_factory=list)
+    # Ids whose delta would have taken stock below zero; left unchanged
+    rejected: List[str] = Field(default_factory=list)
@@ -0,0 +1,30 @@
+from decimal import Decimal
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class TopSellerRead(BaseModel):
+    productId: str
+    # None once the product has been deleted
+    name: Optional[str] = None
+    units: int
+    revenue: Decimal
+    orders: int
+
+    class Config:
+        json_encoders = {
+            Decimal: lambda v: float(v),
+        }
+
+
+class CategoryRevenueRead(BaseModel):
+    category: str
+    units: int
+    revenue: Decimal
+    orders: int
+
+    class Config:
+        json_encoders = {
+            Decimal: lambda v: float(v),
+        }
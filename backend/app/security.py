@@ -1,11 +1,17 @@
+import asyncio
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List
+from typing import Any, Callable, Deque, Dict, List, Optional
 
 from fastapi import HTTPException, status
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
-from .config import Settings
+from .config import Settings, get_settings
 
 # Configure bcrypt with explicit rounds to avoid initialization issues
 pwd_context = CryptContext(
@@ -28,6 +34,134 @@ def verify_password(password: str, hashed: str) -> bool:
     return pwd_context.verify(password, hashed)
 
 
+class PasswordHasherBusy(Exception):
+    """A hash was refused without running; ``per_account`` tells whether one caller hit its limit."""
+
+    def __init__(self, per_account: bool = False):
+        super().__init__("Too many password checks in progress")
+        self.per_account = per_account
+
+
+class PasswordHasher:
+    """Runs bcrypt on its own small thread pool with a bounded backlog.
+
+    bcrypt releases the GIL while hashing, so a few dedicated threads use real cores while the
+    request threadpool stays free for everything else. Work beyond ``max_pending`` (running plus
+    queued) is refused immediately, as is work for a key that already has ``max_per_key`` hashes
+    pending, and work that waited more than ``max_wait`` seconds for a thread is dropped unrun.
+    """
+
+    # Latency percentiles are taken over this many recent hashes
+    SAMPLE_SIZE = 1024
+
+    def __init__(self, workers: int, max_pending: int, max_per_key: int, max_wait: float):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_per_key = max_per_key
+        self.max_wait = max_wait
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._per_key: Dict[str, int] = {}
+        self._wait_ms: Deque[float] = deque(maxlen=self.SAMPLE_SIZE)
+        self._hash_ms: Deque[float] = deque(maxlen=self.SAMPLE_SIZE)
+        self.completed = 0
+        self.rejected = 0
+        self.expired = 0
+
+    async def hash(self, password: str, key: Optional[str] = None) -> str:
+        return await self._submit(hash_password, (password,), key)
+
+    async def verify(self, password: str, hashed: str, key: Optional[str] = None) -> bool:
+        return await self._submit(verify_password, (password, hashed), key)
+
+    async def _submit(self, fn: Callable[..., Any], args: tuple, key: Optional[str]) -> Any:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise PasswordHasherBusy()
+            if key is not None and self._per_key.get(key, 0) >= self.max_per_key:
+                self.rejected += 1
+                raise PasswordHasherBusy(per_account=True)
+            self._pending += 1
+            if key is not None:
+                self._per_key[key] = self._per_key.get(key, 0) + 1
+        future = self._executor.submit(self._run, time.perf_counter(), fn, args)
+        # Released when the work finishes or is cancelled, not when the caller stops waiting
+        future.add_done_callback(lambda _: self._release(key))
+        return await asyncio.wrap_future(future)
+
+    def _release(self, key: Optional[str]) -> None:
+        with self._lock:
+            self._pending -= 1
+            if key is not None:
+                self._per_key[key] -= 1
+                if not self._per_key[key]:
+                    del self._per_key[key]
+
+    def _run(self, queued_at: float, fn: Callable[..., Any], args: tuple) -> Any:
+        started = time.perf_counter()
+        if started - queued_at > self.max_wait:
+            # The caller has likely given up; don't spend a quarter second of CPU on it
+            with self._lock:
+                self.expired += 1
+            raise PasswordHasherBusy()
+        with self._lock:
+            self._running += 1
+        try:
+            return fn(*args)
+        finally:
+            finished = time.perf_counter()
+            with self._lock:
+                self._running -= 1
+                self.completed += 1
+                self._wait_ms.append((started - queued_at) * 1000)
+                self._hash_ms.append((finished - started) * 1000)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "running": self._running,
+                # Waiting for a thread, not yet hashing
+                "queued": self._pending - self._running,
+                "max_pending": self.max_pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "expired": self.expired,
+                "queue_wait_ms": _percentiles(self._wait_ms),
+                "hash_ms": _percentiles(self._hash_ms),
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _percentiles(samples: Deque[float]) -> Dict[str, float]:
+    if not samples:
+        return {"p50": 0.0, "p95": 0.0, "max": 0.0}
+    ordered = sorted(samples)
+    return {
+        "p50": statistics.median(ordered),
+        "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "max": ordered[-1],
+    }
+
+
+def _create_hasher() -> PasswordHasher:
+    settings = get_settings()
+    return PasswordHasher(
+        workers=settings.password_hash_workers,
+        max_pending=settings.password_hash_max_pending,
+        max_per_key=settings.password_hash_max_per_account,
+        max_wait=settings.password_hash_max_wait_seconds,
+    )
+
+
+password_hasher = _create_hasher()
+
+
 def create_access_token(*, email: str, user_id: str, roles: List[str], settings: Settings) -> str:
     expire = datetime.now(timezone.utc) + timedelta(minutes=settings.jwt_exp_minutes)
     to_encode: Dict[str, Any] = {
@@ -1,13 +1,51 @@
 from .auth_service import login, register
 from .product_service import (
+    MAX_BATCH_IDS,
+    PRODUCT_FIELDS,
+    SORT_KEYS,
+    ProductFilters,
+    VersionConflictError,
     create_product,
     delete_product,
+    get_facets,
     get_product,
     get_products,
+    get_products_by_ids,
+    get_products_page,
+    invalidate_product,
+    parse_fields,
+    patch_product,
+    product_cache,
     update_product,
 )
-from .cart_service import add_to_cart, cart_total, clear_cart, get_cart, remove_from_cart
-from .order_service import create_order, get_order, get_user_orders
+from .import_service import detect_import_format, import_products
+from .export_service import export_products
+from .inventory_service import MAX_STOCK_SYNC_ITEMS, sync_stock
+from .cart_service import (
+    MAX_CART_ITEMS_PER_REQUEST,
+    add_items_to_cart,
+    add_to_cart,
+    cart_summary,
+    cart_total,
+    claim_guest_cart,
+    clear_cart,
+    get_cart,
+    remove_from_cart,
+)
+from .cart_store import CartLine, CartStore
+from .order_service import (
+    IDEMPOTENCY_KEY_MAX_LENGTH,
+    create_order,
+    get_order,
+    get_user_orders,
+    get_user_orders_page,
+    request_fingerprint,
+)
+from .report_service import MAX_REPORT_ROWS, REPORT_METRICS, revenue_by_category, top_sellers
+from .outbox_service import CallbackSink, EventSink, FileSink, WebhookSink, outbox_dispatcher
+from .checkout_queue import checkout_queue, queued_checkout_enabled
+from .reservation_service import hold_sweeper, holds_enabled
+from .suggest_service import rebuild_suggest_index, suggest
 from .recommendation_service import recommend_by_product, recommend_by_user
 
 __all__ = [
@@ -16,16 +54,57 @@ __all__ = [
     "create_product",
     "delete_product",
     "get_product",
+    "MAX_BATCH_IDS",
+    "PRODUCT_FIELDS",
+    "SORT_KEYS",
+    "ProductFilters",
+    "VersionConflictError",
+    "get_facets",
     "get_products",
+    "get_products_by_ids",
+    "get_products_page",
+    "invalidate_product",
+    "parse_fields",
+    "patch_product",
+    "product_cache",
     "update_product",
+    "detect_import_format",
+    "import_products",
+    "export_products",
+    "MAX_STOCK_SYNC_ITEMS",
+    "sync_stock",
+    "MAX_CART_ITEMS_PER_REQUEST",
+    "add_items_to_cart",
     "add_to_cart",
+    "cart_summary",
     "cart_total",
+    "claim_guest_cart",
     "clear_cart",
     "get_cart",
     "remove_from_cart",
+    "CartLine",
+    "CartStore",
+    "IDEMPOTENCY_KEY_MAX_LENGTH",
     "create_order",
     "get_order",
     "get_user_orders",
+    "get_user_orders_page",
+    "request_fingerprint",
+    "MAX_REPORT_ROWS",
+    "REPORT_METRICS",
+    "revenue_by_category",
+    "top_sellers",
+    "CallbackSink",
+    "EventSink",
+    "FileSink",
+    "WebhookSink",
+    "outbox_dispatcher",
+    "checkout_queue",
+    "queued_checkout_enabled",
+    "hold_sweeper",
+    "holds_enabled",
+    "rebuild_suggest_index",
+    "suggest",
     "recommend_by_product",
     "recommend_by_user",
 ]
@@ -1,35 +1,76 @@
+from typing import Optional
+
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from ..config import Settings
 from ..models import User
 from ..schemas import AuthResponse, LoginRequest, RegisterRequest
-from ..security import create_access_token, hash_password, verify_password
+from ..security import PasswordHasherBusy, create_access_token, password_hasher
+
+# Database work runs on the request threadpool and bcrypt on the hasher's own threads, so
+# these coroutines never block the event loop and a login burst cannot starve other routes.
+
+
+def _find_user(db: Session, email: str) -> Optional[User]:
+    return db.query(User).filter(User.email == email).first()
+
+
+def _save_user(db: Session, user: User) -> User:
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
 
 
-def register(db: Session, settings: Settings, request: RegisterRequest) -> AuthResponse:
-    existing = db.query(User).filter(User.email == request.email).first()
+def _busy(exc: PasswordHasherBusy) -> HTTPException:
+    if exc.per_account:
+        return HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many attempts for this account, retry shortly",
+            headers={"Retry-After": "1"},
+        )
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication is busy, retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
+
+async def register(db: Session, settings: Settings, request: RegisterRequest) -> AuthResponse:
+    existing = await run_in_threadpool(_find_user, db, request.email)
     if existing:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already exists")
 
+    try:
+        password_hash = await password_hasher.hash(request.password, key=request.email.lower())
+    except PasswordHasherBusy as exc:
+        raise _busy(exc)
+
     user = User(
         name=request.name,
         email=request.email,
-        password_hash=hash_password(request.password),
+        password_hash=password_hash,
         roles=["USER"],
         preferences=[],
     )
-    db.add(user)
-    db.commit()
-    db.refresh(user)
+    user = await run_in_threadpool(_save_user, db, user)
 
     token = create_access_token(email=user.email, user_id=user.id, roles=user.roles, settings=settings)
     return AuthResponse(token=token, userId=user.id, email=user.email, name=user.name, roles=user.roles)
 
 
-def login(db: Session, settings: Settings, request: LoginRequest) -> AuthResponse:
-    user = db.query(User).filter(User.email == request.email).first()
-    if not user or not verify_password(request.password, user.password_hash):
+async def login(db: Session, settings: Settings, request: LoginRequest) -> AuthResponse:
+    user = await run_in_threadpool(_find_user, db, request.email)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid email or password")
+
+    try:
+        valid = await password_hasher.verify(request.password, user.password_hash, key=request.email.lower())
+    except PasswordHasherBusy as exc:
+        raise _busy(exc)
+    if not valid:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid email or password")
 
     token = create_access_token(email=user.email, user_id=user.id, roles=user.roles, settings=settings)
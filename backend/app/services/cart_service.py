@@ -1,55 +1,83 @@
 from decimal import Decimal
-from typing import List
+from typing import Any, Dict, List, Sequence, Tuple
 
-from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 
-from ..models import CartItem, Product
+from .cart_store import cart_store
+from .reservation_service import holds_enabled, place_holds, release_holds, release_units
 
+MAX_CART_ITEMS_PER_REQUEST = 100
 
-def add_to_cart(db: Session, user_id: str, product_id: str, quantity: int) -> CartItem:
-    product = db.get(Product, product_id)
-    if not product:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Product not found")
-    if product.stock < quantity:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Insufficient stock")
+# Cart functions take an ``owner``: the user id, or ``guest:<cart id>`` for guest carts
+# when the configured store supports them.
 
-    existing = (
-        db.query(CartItem)
-        .filter(CartItem.user_id == user_id, CartItem.product_id == product_id)
-        .first()
-    )
 
-    if existing:
-        existing.quantity += quantity
-        db.commit()
-        db.refresh(existing)
-        return existing
+def add_to_cart(db: Session, owner: str, product_id: str, quantity: int) -> Any:
+    return add_items_to_cart(db, owner, [(product_id, quantity)])[0]
 
-    item = CartItem(user_id=user_id, product_id=product_id, quantity=quantity, price=product.price)
-    db.add(item)
-    db.commit()
-    db.refresh(item)
-    return item
 
+def add_items_to_cart(db: Session, owner: str, items: Sequence[Tuple[str, int]]) -> List[Any]:
+    """Add several products at once; lines already in the cart have their quantity increased.
 
-def get_cart(db: Session, user_id: str) -> List[CartItem]:
-    return db.query(CartItem).filter(CartItem.user_id == user_id).all()
+    Either every item is added or, if any product is missing or short on stock, none is.
+    With holds enabled the units are also reserved, so "short on stock" means fewer units
+    available than requested once other carts' holds are taken out.
+    """
+    quantities: Dict[str, int] = {}
+    for product_id, quantity in items:
+        # A single upsert may not touch the same cart row twice
+        quantities[product_id] = quantities.get(product_id, 0) + quantity
 
+    if holds_enabled():
+        place_holds(db, owner, quantities)
+        try:
+            lines = cart_store.add_items(db, owner, quantities)
+        except Exception:
+            # Only this call's units: the holds may also carry units from earlier adds
+            release_units(db, owner, quantities)
+            raise
+    else:
+        lines = cart_store.add_items(db, owner, quantities)
 
-def remove_from_cart(db: Session, user_id: str, product_id: str) -> None:
-    db.query(CartItem).filter(CartItem.user_id == user_id, CartItem.product_id == product_id).delete()
-    db.commit()
+    added = {line.product_id: line for line in lines}
+    return [added[product_id] for product_id in quantities]
 
 
-def clear_cart(db: Session, user_id: str) -> None:
-    db.query(CartItem).filter(CartItem.user_id == user_id).delete()
-    db.commit()
+def get_cart(db: Session, owner: str) -> List[Any]:
+    return cart_store.lines(db, owner)
 
 
-def cart_total(db: Session, user_id: str) -> Decimal:
-    items = db.query(CartItem).filter(CartItem.user_id == user_id).all()
-    total = Decimal("0")
-    for item in items:
-        total += item.price * item.quantity
-    return total
+def remove_from_cart(db: Session, owner: str, product_id: str) -> None:
+    cart_store.remove(db, owner, product_id)
+    if holds_enabled():
+        release_holds(db, owner, [product_id])
+
+
+def clear_cart(db: Session, owner: str) -> None:
+    cart_store.clear(db, owner)
+    if holds_enabled():
+        release_holds(db, owner)
+
+
+def cart_total(db: Session, owner: str) -> Decimal:
+    return cart_store.total(db, owner)
+
+
+def cart_summary(db: Session, owner: str) -> Dict[str, Any]:
+    """Cart lines with total units, subtotal and warnings for lines short of available stock."""
+    return cart_store.summary(db, owner)
+
+
+def claim_guest_cart(db: Session, guest_owner: str, user_id: str) -> List[Any]:
+    """Move a guest cart into a signed-in user's cart, merging quantities.
+
+    The guest cart is only cleared once its items were added, so a stock failure keeps it.
+    """
+    lines = cart_store.lines(db, guest_owner)
+    if holds_enabled():
+        # The user's cart reserves the units afresh; the guest's holds would otherwise count twice
+        release_holds(db, guest_owner)
+    if lines:
+        add_items_to_cart(db, user_id, [(line.product_id, line.quantity) for line in lines])
+        cart_store.clear(db, guest_owner)
+    return cart_store.lines(db, user_id)
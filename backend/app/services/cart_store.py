@@ -0,0 +1,246 @@
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import Integer, String, cast, column, func, literal, select, values
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session, lazyload
+
+from ..config import get_settings
+from ..kvstore import InMemoryKeyValueStore
+from ..models import CartItem, Product, StockHold
+from .product_service import get_products_by_ids
+
+CART_BACKENDS = ("sql", "memory")
+
+
+@dataclass
+class CartLine:
+    # Attribute names match CartItem, so both serialize through CartItemRead
+    id: str
+    user_id: str
+    product_id: str
+    quantity: int
+    price: Decimal
+
+
+class CartStore:
+    """Where carts live between visits. ``owner`` is a user id or a ``guest:<id>`` key.
+
+    ``quantities`` maps product ids to the units to add. Adds are all-or-nothing and fail
+    with a 400 if a product is missing or has less stock than requested.
+    """
+
+    # Whether carts can belong to visitors without a user row
+    supports_guests = False
+    # Whether the cart lives in the database session, so clearing it can join the order transaction
+    transactional = False
+
+    def add_items(self, db: Session, owner: str, quantities: Dict[str, int]) -> List[Any]:
+        raise NotImplementedError
+
+    def lines(self, db: Session, owner: str) -> List[Any]:
+        raise NotImplementedError
+
+    def remove(self, db: Session, owner: str, product_id: str) -> None:
+        raise NotImplementedError
+
+    def clear(self, db: Session, owner: str, commit: bool = True) -> None:
+        raise NotImplementedError
+
+    def total(self, db: Session, owner: str) -> Decimal:
+        return sum((line.price * line.quantity for line in self.lines(db, owner)), Decimal("0"))
+
+    def summary(self, db: Session, owner: str) -> Dict[str, Any]:
+        lines = self.lines(db, owner)
+        products, _ = get_products_by_ids(db, [line.product_id for line in lines])
+        held = _held(db, owner)
+        available = {product.id: product.stock - product.reserved + held.get(product.id, 0) for product in products}
+        return _summarize(
+            [(line, available.get(line.product_id, 0)) for line in lines],
+            subtotal=sum((line.price * line.quantity for line in lines), Decimal("0")),
+            item_count=sum(line.quantity for line in lines),
+        )
+
+
+def _held(db: Session, owner: str) -> Dict[str, int]:
+    return dict(db.query(StockHold.product_id, StockHold.quantity).filter(StockHold.owner == owner))
+
+
+def _summarize(rows, subtotal: Decimal, item_count: int) -> Dict[str, Any]:
+    # ``rows`` pair each line with the units available to this cart: stock less other carts'
+    # holds, the same test checkout applies
+    warnings = [
+        {"productId": line.product_id, "requested": line.quantity, "available": available}
+        for line, available in rows
+        if available < line.quantity
+    ]
+    return {"items": [line for line, _ in rows], "itemCount": item_count, "subtotal": subtotal, "warnings": warnings}
+
+
+def _rejection(db: Session, quantities: Dict[str, int]) -> HTTPException:
+    products, missing = get_products_by_ids(db, list(quantities))
+    if missing:
+        detail = f"Product not found: {', '.join(missing)}"
+    else:
+        short = [product.id for product in products if product.stock < quantities[product.id]]
+        detail = f"Insufficient stock: {', '.join(short)}"
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
+class SqlCartStore(CartStore):
+    """Carts as rows in the ``carts`` table; every change is a committed write."""
+
+    transactional = True
+
+    def add_items(self, db: Session, owner: str, quantities: Dict[str, int]) -> List[CartItem]:
+        # One INSERT ... SELECT ... ON CONFLICT DO UPDATE ... RETURNING checks stock,
+        # copies the price and merges with existing lines
+        requested = values(column("product_id", String), column("quantity", Integer), name="requested").data(
+            list(quantities.items())
+        )
+        rows = (
+            select(
+                cast(func.gen_random_uuid(), String),
+                literal(owner, String),
+                Product.id,
+                requested.c.quantity,
+                Product.price,
+            )
+            .join_from(requested, Product, Product.id == requested.c.product_id)
+            .where(Product.stock >= requested.c.quantity)
+        )
+        stmt = insert(CartItem).from_select(["id", "user_id", "product_id", "quantity", "price"], rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[CartItem.user_id, CartItem.product_id],
+            set_={"quantity": CartItem.quantity + stmt.excluded.quantity},
+        ).returning(CartItem)
+
+        added = db.scalars(stmt, execution_options={"populate_existing": True}).all()
+        if len(added) < len(quantities):
+            db.rollback()
+            raise _rejection(db, quantities)
+
+        # Detach the returned rows so committing does not expire them and force a reload
+        for item in added:
+            db.expunge(item)
+        db.commit()
+        return added
+
+    def lines(self, db: Session, owner: str) -> List[CartItem]:
+        return db.query(CartItem).options(lazyload(CartItem.product)).filter(CartItem.user_id == owner).all()
+
+    def remove(self, db: Session, owner: str, product_id: str) -> None:
+        db.query(CartItem).filter(CartItem.user_id == owner, CartItem.product_id == product_id).delete()
+        db.commit()
+
+    def clear(self, db: Session, owner: str, commit: bool = True) -> None:
+        db.query(CartItem).filter(CartItem.user_id == owner).delete()
+        if commit:
+            db.commit()
+
+    def total(self, db: Session, owner: str) -> Decimal:
+        return (
+            db.query(func.coalesce(func.sum(CartItem.price * CartItem.quantity), 0))
+            .filter(CartItem.user_id == owner)
+            .scalar()
+        )
+
+    def summary(self, db: Session, owner: str) -> Dict[str, Any]:
+        # Lines, available units and totals from one query; the totals are window aggregates.
+        # The cart's own hold counts as available to it, as at checkout.
+        rows = (
+            db.query(
+                CartItem,
+                Product.stock - Product.reserved + func.coalesce(StockHold.quantity, 0),
+                func.sum(CartItem.price * CartItem.quantity).over(),
+                func.sum(CartItem.quantity).over(),
+            )
+            .join(Product, Product.id == CartItem.product_id)
+            .outerjoin(StockHold, (StockHold.owner == owner) & (StockHold.product_id == CartItem.product_id))
+            .options(lazyload(CartItem.product))
+            .filter(CartItem.user_id == owner)
+            .order_by(CartItem.id)
+            .all()
+        )
+        subtotal, item_count = (rows[0][2], rows[0][3]) if rows else (Decimal("0"), 0)
+        return _summarize([(item, available) for item, available, _, _ in rows], subtotal, item_count)
+
+
+class KeyValueCartStore(CartStore):
+    """Carts as two hashes per owner (product id -> quantity, product id -> price) in a KV store.
+
+    Works with ``InMemoryKeyValueStore`` or a redis-py client created with
+    ``decode_responses=True``. Carts expire ``ttl_seconds`` after their last change and are
+    never written to Postgres; checkout turns them into orders.
+    """
+
+    supports_guests = True
+
+    def __init__(self, kv: Any, ttl_seconds: int):
+        self.kv = kv
+        self.ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def _keys(owner: str):
+        return f"cart:{owner}:qty", f"cart:{owner}:price"
+
+    def add_items(self, db: Session, owner: str, quantities: Dict[str, int]) -> List[CartLine]:
+        products, missing = get_products_by_ids(db, list(quantities))
+        if missing or any(product.stock < quantities[product.id] for product in products):
+            raise _rejection(db, quantities)
+
+        qty_key, price_key = self._keys(owner)
+        added = []
+        for product in products:
+            # The price is captured when the product first enters the cart, as with the SQL store
+            self.kv.hsetnx(price_key, product.id, str(product.price))
+            quantity = self.kv.hincrby(qty_key, product.id, quantities[product.id])
+            added.append((product.id, quantity))
+        self.kv.expire(qty_key, self.ttl_seconds)
+        self.kv.expire(price_key, self.ttl_seconds)
+
+        prices = self.kv.hgetall(price_key)
+        return [self._line(owner, product_id, quantity, prices.get(product_id)) for product_id, quantity in added]
+
+    def lines(self, db: Session, owner: str) -> List[CartLine]:
+        qty_key, price_key = self._keys(owner)
+        quantities = self.kv.hgetall(qty_key)
+        prices = self.kv.hgetall(price_key)
+        # A line whose price was removed concurrently is treated as removed
+        return [
+            self._line(owner, product_id, int(quantity), prices[product_id])
+            for product_id, quantity in quantities.items()
+            if product_id in prices
+        ]
+
+    def remove(self, db: Session, owner: str, product_id: str) -> None:
+        qty_key, price_key = self._keys(owner)
+        self.kv.hdel(qty_key, product_id)
+        self.kv.hdel(price_key, product_id)
+
+    def clear(self, db: Session, owner: str, commit: bool = True) -> None:
+        self.kv.delete(*self._keys(owner))
+
+    @staticmethod
+    def _line(owner: str, product_id: str, quantity: int, price: Optional[str]) -> CartLine:
+        return CartLine(
+            id=f"{owner}:{product_id}",
+            user_id=owner,
+            product_id=product_id,
+            quantity=quantity,
+            price=Decimal(price or "0"),
+        )
+
+
+def _create_store() -> CartStore:
+    settings = get_settings()
+    if settings.cart_backend == "sql":
+        return SqlCartStore()
+    if settings.cart_backend == "memory":
+        return KeyValueCartStore(InMemoryKeyValueStore(), settings.cart_ttl_seconds)
+    raise ValueError(f"Unknown cart backend {settings.cart_backend!r}; expected one of {', '.join(CART_BACKENDS)}")
+
+
+cart_store = _create_store()
@@ -0,0 +1,269 @@
+import asyncio
+import logging
+import math
+import queue
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import uuid4
+
+from fastapi import HTTPException, status
+
+from ..cache import TTLCache
+from ..config import get_settings
+from ..database import SessionLocal
+from ..schemas import OrderRead
+from .cart_store import cart_store
+from .order_service import finish_order, place_order
+from .reservation_service import lock_holds, lock_products
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+@dataclass
+class CheckoutJob:
+    user_id: str
+    idempotency_key: Optional[str] = None
+    fingerprint: str = ""
+    id: str = field(default_factory=lambda: str(uuid4()))
+    # queued -> processing -> placed | failed
+    status: str = "queued"
+    order: Optional[OrderRead] = None
+    # Set once the order is committed, even if it could not be read back for ``order``
+    order_id: Optional[str] = None
+    error: Optional[str] = None
+    status_code: Optional[int] = None
+    done: threading.Event = field(default_factory=threading.Event, repr=False)
+    # Long-polling requests, woken on their own event loop when the job finishes
+    _waiters: List[Tuple[asyncio.AbstractEventLoop, "asyncio.Future[None]"]] = field(default_factory=list, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def finish(
+        self,
+        order: Optional[OrderRead] = None,
+        order_id: Optional[str] = None,
+        error: Optional[str] = None,
+        status_code: int = 200,
+    ) -> None:
+        with self._lock:
+            self.order, self.error, self.status_code = order, error, status_code
+            self.order_id = order_id or (order.id if order is not None else None)
+            self.status = "placed" if self.order_id is not None else "failed"
+            self.done.set()
+            waiters, self._waiters = self._waiters, []
+        for loop, future in waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, future)
+            except RuntimeError:
+                # The waiter's loop has closed; nobody is listening any more
+                pass
+
+    async def wait(self, timeout: float) -> None:
+        """Wait up to ``timeout`` seconds for the job to finish, without holding a thread."""
+        loop = asyncio.get_running_loop()
+        future: "asyncio.Future[None]" = loop.create_future()
+        with self._lock:
+            if self.done.is_set():
+                return
+            self._waiters.append((loop, future))
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._lock:
+                if (loop, future) in self._waiters:
+                    self._waiters.remove((loop, future))
+
+
+def _wake(future: "asyncio.Future[None]") -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class CheckoutQueue:
+    """Checkouts handed to a pool of worker threads that place them in micro-batches.
+
+    Each worker takes up to ``batch_size`` queued jobs (waiting at most ``batch_window`` seconds
+    for a batch to fill) and places them in one transaction, one savepoint per job. Checkouts
+    of the same hot products then share one set of row locks and one commit instead of queueing
+    on each other. Jobs and their results live in this process only.
+
+    Every user's checkouts go to one worker (by a hash of the user id), so two checkouts of
+    the same cart are never placed by concurrent batches that could both read it.
+    """
+
+    def __init__(self, workers: int, batch_size: int, batch_window: float, max_queued: int, job_ttl: float):
+        self.workers = max(workers, 1)
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self._queues: List["queue.Queue[CheckoutJob]"] = [
+            queue.Queue(maxsize=math.ceil(max_queued / self.workers)) for _ in range(self.workers)
+        ]
+        # Unfinished jobs are never evicted; once finished they move to the cache and
+        # stay readable for job_ttl seconds
+        self._pending: Dict[str, CheckoutJob] = {}
+        self._pending_lock = threading.Lock()
+        self._jobs = TTLCache(max(max_queued * 2, 1), job_ttl)
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        if self._threads:
+            return
+        self._stop.clear()
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._run, args=(index,), name=f"checkout-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._threads = []
+
+    def submit(self, user_id: str, idempotency_key: Optional[str] = None, fingerprint: str = "") -> CheckoutJob:
+        """Queue a checkout; raises a 503 when the queue is full."""
+        job = CheckoutJob(user_id, idempotency_key, fingerprint)
+        with self._pending_lock:
+            self._pending[job.id] = job
+        try:
+            self._queues[zlib.crc32(user_id.encode("utf-8")) % self.workers].put_nowait(job)
+        except queue.Full:
+            with self._pending_lock:
+                del self._pending[job.id]
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Checkout queue is full, retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        return job
+
+    def get(self, job_id: str) -> Optional[CheckoutJob]:
+        with self._pending_lock:
+            job = self._pending.get(job_id)
+        return job if job is not None else self._jobs.get(job_id)
+
+    def _finish(self, job: CheckoutJob, **result: Any) -> None:
+        job.finish(**result)
+        # Cache before dropping it from pending, so get() never misses a job in between
+        self._jobs.set(job.id, job)
+        with self._pending_lock:
+            self._pending.pop(job.id, None)
+
+    def _run(self, index: int) -> None:
+        jobs = self._queues[index]
+        deferred: List[CheckoutJob] = []
+        while not self._stop.is_set():
+            batch, deferred = self._next_batch(jobs, deferred)
+            if batch:
+                self._place(batch)
+
+    def _next_batch(
+        self, jobs: "queue.Queue[CheckoutJob]", carried: List[CheckoutJob]
+    ) -> Tuple[List[CheckoutJob], List[CheckoutJob]]:
+        """The next batch, starting with jobs carried over from the last one; returns it and
+        the jobs to carry over to the batch after it.
+        """
+        batch: List[CheckoutJob] = []
+        users: set = set()
+        deferred: List[CheckoutJob] = []
+
+        def take(job: CheckoutJob) -> None:
+            # Two checkouts of one cart are not compatible; the second waits for the next batch
+            if job.user_id in users or len(batch) >= self.batch_size:
+                deferred.append(job)
+            else:
+                batch.append(job)
+                users.add(job.user_id)
+
+        for job in carried:
+            take(job)
+        if not batch:
+            try:
+                take(jobs.get(timeout=0.5))
+            except queue.Empty:
+                return [], deferred
+
+        deadline = time.monotonic() + self.batch_window
+        while len(batch) < self.batch_size:
+            try:
+                take(jobs.get(timeout=max(deadline - time.monotonic(), 0)))
+            except queue.Empty:
+                break
+        return batch, deferred
+
+    def _place(self, batch: List[CheckoutJob]) -> None:
+        db = SessionLocal()
+        try:
+            for job, order, order_id, quantities in self._commit_batch(db, batch):
+                self._report_placed(db, job, order, order_id, quantities)
+        finally:
+            db.close()
+
+    def _commit_batch(self, db, batch: List[CheckoutJob]) -> List[Tuple[CheckoutJob, Any, str, Dict[str, int]]]:
+        """Place the batch in one transaction; returns the committed jobs and their orders.
+
+        Jobs that were rejected, or all of them if the transaction fails, are finished as failed.
+        """
+        try:
+            for job in batch:
+                job.status = "processing"
+            carts: Dict[str, List[Any]] = {job.id: cart_store.lines(db, job.user_id) for job in batch}
+            # Lock every product the batch touches, in id order, and then its holds, so concurrent
+            # batches cannot deadlock; the per-job updates then never wait
+            lock_products(db, sorted({line.product_id for lines in carts.values() for line in lines}))
+            lock_holds(db, [job.user_id for job in batch])
+
+            placed = []
+            for job in batch:
+                try:
+                    with db.begin_nested():
+                        order, quantities = place_order(
+                            db, job.user_id, carts[job.id], job.idempotency_key, job.fingerprint
+                        )
+                    placed.append((job, order, order.id, quantities))
+                except HTTPException as exc:
+                    self._finish(job, error=exc.detail, status_code=exc.status_code)
+            db.commit()
+            return placed
+        except Exception as exc:
+            db.rollback()
+            logger.exception("Placing a checkout batch failed")
+            for job in batch:
+                if not job.done.is_set():
+                    self._finish(job, error=f"Failed to create order: {exc}", status_code=500)
+            return []
+
+    def _report_placed(self, db, job: CheckoutJob, order: Any, order_id: str, quantities: Dict[str, int]) -> None:
+        # The order is committed, so the job must report it as placed whatever fails from here;
+        # a failed job would make the client retry and order twice
+        try:
+            finish_order(db, job.user_id, quantities)
+        except Exception:
+            db.rollback()
+            logger.exception("Post-checkout cleanup for order %s failed", order_id)
+        try:
+            read = OrderRead.model_validate(order)
+        except Exception:
+            db.rollback()
+            logger.exception("Reading back order %s failed; reporting its id only", order_id)
+            read = None
+        self._finish(job, order=read, order_id=order_id)
+
+
+checkout_queue = CheckoutQueue(
+    workers=settings.checkout_workers,
+    batch_size=settings.checkout_batch_size,
+    batch_window=settings.checkout_batch_window_ms / 1000,
+    max_queued=settings.checkout_queue_size,
+    job_ttl=settings.checkout_job_ttl_seconds,
+)
+
+
+def queued_checkout_enabled() -> bool:
+    return settings.checkout_mode == "queued"
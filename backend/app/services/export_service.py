@@ -0,0 +1,70 @@
+import csv
+import io
+import json
+from decimal import Decimal
+from typing import Any, Iterator, Sequence
+
+from sqlalchemy import select
+
+from ..database import SessionLocal
+from ..models import Product
+from .import_service import CSV_LIST_SEPARATOR
+from .product_service import PRODUCT_FIELDS
+
+EXPORT_FORMATS = ("ndjson", "csv")
+EXPORT_BATCH_SIZE = 1000
+
+
+def export_products(fmt: str) -> Iterator[str]:
+    """Stream the whole catalog as NDJSON lines or CSV rows (re-importable by import_products).
+
+    The generator owns its session, so it can outlive the request-scoped one, and reads
+    through a server-side cursor in batches of ``EXPORT_BATCH_SIZE`` rows.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    return _export(fmt)
+
+
+def _export(fmt: str) -> Iterator[str]:
+    columns = [getattr(Product, field) for field in PRODUCT_FIELDS]
+    stmt = select(*columns).order_by(Product.id).execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+    db = SessionLocal()
+    try:
+        result = db.execute(stmt)
+        if fmt == "csv":
+            yield _csv_lines([PRODUCT_FIELDS])
+        for partition in result.partitions():
+            if fmt == "csv":
+                yield _csv_lines([_csv_row(row) for row in partition])
+            else:
+                yield "".join(json.dumps(dict(row._mapping), default=_json_default) + "\n" for row in partition)
+    finally:
+        db.close()
+
+
+def _csv_row(row: Any) -> Sequence[Any]:
+    return [_csv_value(value) for value in row]
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return CSV_LIST_SEPARATOR.join(value)
+    if isinstance(value, dict):
+        return json.dumps(value)
+    return value
+
+
+def _csv_lines(rows: Sequence[Sequence[Any]]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -0,0 +1,160 @@
+import csv
+import json
+from typing import Any, Dict, Iterator, List, TextIO, Tuple
+from uuid import uuid4
+
+from pydantic import ValidationError
+from sqlalchemy import literal_column
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from ..models import Product
+from ..schemas import ProductImportError, ProductImportReport, ProductImportRow
+from .outbox_service import PRODUCT_CREATED, PRODUCT_UPDATED, emit_event
+from .product_service import PRODUCT_EVENT_COLUMNS, invalidate_product, product_event_payload
+from .suggest_service import suggest_index
+
+IMPORT_FORMATS = ("ndjson", "csv")
+IMPORT_CHUNK_SIZE = 1000
+
+# CSV has no native lists or objects: list columns are "|"-separated, attributes is a JSON object.
+CSV_LIST_SEPARATOR = "|"
+
+_UPSERT_COLUMNS = ("name", "description", "categories", "price", "images", "stock", "attributes")
+
+
+def detect_import_format(filename: str | None) -> str:
+    if filename and filename.lower().endswith(".csv"):
+        return "csv"
+    return "ndjson"
+
+
+def import_products(
+    db: Session,
+    stream: TextIO,
+    fmt: str,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+) -> ProductImportReport:
+    """Validate and upsert products from an NDJSON or CSV stream, one chunk at a time.
+
+    Bad rows are reported by line number and skipped; the rest of the batch is still written.
+    Each chunk emits its product events in the transaction that writes it.
+    """
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError(f"Unsupported import format: {fmt}")
+
+    report = ProductImportReport()
+    chunk: List[Tuple[int, Dict[str, Any]]] = []
+
+    for line, data in _iter_rows(stream, fmt):
+        report.processed += 1
+        try:
+            if isinstance(data, Exception):
+                raise data
+            row = ProductImportRow.model_validate(data)
+        except (ValueError, TypeError) as exc:
+            report.errors.append(ProductImportError(line=line, error=_describe(exc)))
+            continue
+
+        values = row.model_dump()
+        values["id"] = values["id"] or str(uuid4())
+        chunk.append((line, values))
+        if len(chunk) >= chunk_size:
+            _write_chunk(db, chunk, report)
+            chunk = []
+
+    if chunk:
+        _write_chunk(db, chunk, report)
+    return report
+
+
+def _iter_rows(stream: TextIO, fmt: str) -> Iterator[Tuple[int, Any]]:
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            try:
+                yield reader.line_num, _csv_record(record)
+            except ValueError as exc:
+                yield reader.line_num, exc
+        return
+
+    for line, text in enumerate(stream, start=1):
+        text = text.strip()
+        if not text:
+            continue
+        try:
+            yield line, json.loads(text)
+        except ValueError as exc:
+            yield line, exc
+
+
+def _csv_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    data = {key: value for key, value in record.items() if key and value not in (None, "")}
+    for key in ("categories", "images"):
+        if key in data:
+            data[key] = [part.strip() for part in data[key].split(CSV_LIST_SEPARATOR) if part.strip()]
+    if "attributes" in data:
+        data["attributes"] = json.loads(data["attributes"])
+    return data
+
+
+def _write_chunk(db: Session, chunk: List[Tuple[int, Dict[str, Any]]], report: ProductImportReport) -> None:
+    # A single statement may not touch the same row twice, so the last occurrence of an id wins.
+    by_id = {values["id"]: (line, values) for line, values in chunk}
+    rows = list(by_id.values())
+    written = rows
+
+    try:
+        _emit_events(db, db.execute(_returning_events(_upsert([values for _, values in rows]))).all())
+        db.commit()
+    except SQLAlchemyError:
+        db.rollback()
+        # Retry row by row so one bad row does not sink the chunk
+        written = []
+        products = []
+        for line, values in rows:
+            try:
+                with db.begin_nested():
+                    products.extend(db.execute(_returning_events(_upsert([values]))).all())
+                written.append((line, values))
+            except SQLAlchemyError as exc:
+                report.errors.append(ProductImportError(line=line, error=_describe(exc)))
+        _emit_events(db, products)
+        db.commit()
+
+    report.imported += len(written)
+    for _, values in written:
+        invalidate_product(values["id"])
+    suggest_index.upsert_products((values["id"], values["name"], values["categories"]) for _, values in written)
+
+
+def _upsert(rows: List[Dict[str, Any]]):
+    stmt = insert(Product).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[Product.id],
+        # Bump the version like every other write, so PATCHes based on a pre-import read conflict
+        set_={**{column: stmt.excluded[column] for column in _UPSERT_COLUMNS}, "version": Product.version + 1},
+    )
+
+
+def _returning_events(stmt):
+    # xmax is zero only for a row version this statement inserted, not one it updated
+    return stmt.returning(*PRODUCT_EVENT_COLUMNS, literal_column("xmax = 0").label("inserted"))
+
+
+def _emit_events(db: Session, products) -> None:
+    for product in products:
+        event_type = PRODUCT_CREATED if product.inserted else PRODUCT_UPDATED
+        emit_event(db, event_type, product.id, product_event_payload(product))
+
+
+def _describe(exc: Exception) -> str:
+    if isinstance(exc, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors()
+        )
+    if isinstance(exc, SQLAlchemyError):
+        orig = getattr(exc, "orig", None)
+        return str(orig or exc).strip().splitlines()[0]
+    return str(exc)
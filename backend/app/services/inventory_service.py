@@ -0,0 +1,80 @@
+from typing import Dict, List, Sequence, Set, Tuple
+
+from sqlalchemy import Boolean, Integer, String, case, column, update, values
+from sqlalchemy.orm import Session
+
+from ..models import Product
+from ..schemas import StockSyncItem, StockSyncReport
+from .outbox_service import PRODUCT_UPDATED, emit_event
+from .product_service import PRODUCT_EVENT_COLUMNS, invalidate_product, product_event_payload
+
+STOCK_SYNC_CHUNK_SIZE = 1000
+MAX_STOCK_SYNC_ITEMS = 50_000
+
+
+def sync_stock(
+    db: Session,
+    items: Sequence[StockSyncItem],
+    chunk_size: int = STOCK_SYNC_CHUNK_SIZE,
+) -> StockSyncReport:
+    """Apply absolute stock levels and deltas with one UPDATE ... FROM (VALUES ...) per chunk.
+
+    Each chunk commits on its own, together with a product event per updated row. A delta that would take stock below zero is rejected
+    by the statement itself, so concurrent decrements from checkout cannot be lost.
+    """
+    report = StockSyncReport()
+    changes = list(_merge(items).items())
+    for start in range(0, len(changes), chunk_size):
+        _apply_chunk(db, changes[start:start + chunk_size], report)
+    return report
+
+
+def _merge(items: Sequence[StockSyncItem]) -> Dict[str, Tuple[int, bool]]:
+    # One statement may not update a row twice, so fold repeated ids into a single
+    # (amount, is_delta) change, applying them in request order.
+    merged: Dict[str, Tuple[int, bool]] = {}
+    for item in items:
+        if item.stock is not None:
+            merged[item.product_id] = (item.stock, False)
+        else:
+            amount, is_delta = merged.get(item.product_id, (0, True))
+            merged[item.product_id] = (amount + item.delta, is_delta)
+    return merged
+
+
+def _apply_chunk(db: Session, chunk: List[Tuple[str, Tuple[int, bool]]], report: StockSyncReport) -> None:
+    changes = values(
+        column("id", String),
+        column("amount", Integer),
+        column("is_delta", Boolean),
+        name="changes",
+    ).data(sorted((product_id, amount, is_delta) for product_id, (amount, is_delta) in chunk))
+    new_stock = case((changes.c.is_delta, Product.stock + changes.c.amount), else_=changes.c.amount)
+
+    stmt = (
+        update(Product)
+        .where(Product.id == changes.c.id, new_stock >= 0)
+        .values(stock=new_stock, version=Product.version + 1)
+        .returning(*PRODUCT_EVENT_COLUMNS)
+        .execution_options(synchronize_session=False)
+    )
+    updated = {}
+    for product in db.execute(stmt):
+        updated[product.id] = product.stock
+        emit_event(db, PRODUCT_UPDATED, product.id, product_event_payload(product))
+
+    unmatched = [product_id for product_id, _ in chunk if product_id not in updated]
+    existing = _existing_ids(db, unmatched)
+    db.commit()
+
+    report.updated.update(updated)
+    for product_id in unmatched:
+        (report.rejected if product_id in existing else report.missing).append(product_id)
+    for product_id in updated:
+        invalidate_product(product_id)
+
+
+def _existing_ids(db: Session, product_ids: List[str]) -> Set[str]:
+    if not product_ids:
+        return set()
+    return {product_id for (product_id,) in db.query(Product.id).filter(Product.id.in_(product_ids))}
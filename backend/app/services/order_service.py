@@ -1,59 +1,212 @@
+import hashlib
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal
-from typing import List
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from uuid import uuid4
 
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import Integer, String, column, func, update, values
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session, selectinload
 
-from ..models import CartItem, Order, OrderItem, Product, User
+from ..config import get_settings
+from ..models import IdempotencyKey, Order, OrderItem, Product
+from ..pagination import decode_cursor, encode_cursor, keyset_after
+from .cart_store import cart_store
+from .outbox_service import ORDER_PLACED, emit_event
+from .product_service import invalidate_product
+from .reservation_service import consume_holds, lock_products
+from .suggest_service import suggest_index
 
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+ORDER_HISTORY_KEY = (Order.created_at, Order.id)
+ORDER_HISTORY_SCOPE = "orders"
 
-def create_order(db: Session, user_id: str) -> Order:
-    # Use joinedload to avoid N+1 query problem
-    cart_items: List[CartItem] = (
-        db.query(CartItem)
-        .options(joinedload(CartItem.product))
-        .filter(CartItem.user_id == user_id)
-        .all()
+settings = get_settings()
+
+
+def request_fingerprint(*parts: str) -> str:
+    """Hash of a request's inputs, stored with its Idempotency-Key."""
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+def _key_cutoff():
+    return func.now() - timedelta(hours=settings.idempotency_key_ttl_hours)
+
+
+def _replay(db: Session, user_id: str, key: str, fingerprint: str) -> Optional[Order]:
+    """The order an earlier request with ``key`` placed, if any.
+
+    Raises a 422 when ``fingerprint`` shows the key is being reused for a different request.
+    """
+    record = (
+        db.query(IdempotencyKey)
+        .filter(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key, IdempotencyKey.created_at >= _key_cutoff())
+        .first()
+    )
+    if record is None:
+        return None
+    if record.fingerprint != fingerprint:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key was already used for a different request",
+        )
+    return db.get(Order, record.order_id)
+
+
+def _claim_key(db: Session, user_id: str, key: str, fingerprint: str, order_id: str) -> bool:
+    """Record the key for this order; False if another request already holds it.
+
+    A concurrent request with the same key blocks on the primary key until the first one
+    commits or rolls back, which is what collapses duplicates into one order.
+    Expired keys are taken over.
+    """
+    stmt = insert(IdempotencyKey).values(
+        user_id=user_id,
+        key=key,
+        fingerprint=fingerprint,
+        order_id=order_id,
+        created_at=func.now(),
     )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[IdempotencyKey.user_id, IdempotencyKey.key],
+        set_={column: stmt.excluded[column] for column in ("fingerprint", "order_id", "created_at")},
+        where=IdempotencyKey.created_at < _key_cutoff(),
+    ).returning(IdempotencyKey.key)
+    return db.execute(stmt).first() is not None
+
+
+def _decrement_stock(db: Session, owner: str, quantities: Dict[str, int]) -> Dict[str, List[str]]:
+    """Take every line's quantity off stock in one conditional UPDATE, or raise with nothing taken.
+
+    Returns each product's categories, read from the updated rows.
+
+    The cart's own holds are consumed in the same transaction, so units it reserved count as
+    available to it. The guard is evaluated against the row as locked by the UPDATE, so two
+    checkouts racing for the last units cannot both succeed.
+    """
+    product_ids = sorted(quantities)
+    lock_products(db, product_ids)
+    held = consume_holds(db, owner, product_ids)
+
+    lines = values(column("id", String), column("qty", Integer), column("held", Integer), name="lines").data(
+        [(product_id, quantities[product_id], held.get(product_id, 0)) for product_id in product_ids]
+    )
+    stmt = (
+        update(Product)
+        .where(Product.id == lines.c.id, Product.stock - Product.reserved + lines.c.held >= lines.c.qty)
+        .values(
+            stock=Product.stock - lines.c.qty,
+            reserved=Product.reserved - lines.c.held,
+            version=Product.version + 1,
+        )
+        .returning(Product.id, Product.categories)
+        .execution_options(synchronize_session=False)
+    )
+    decremented = dict(db.execute(stmt).all())
+    if len(decremented) == len(product_ids):
+        return decremented
+
+    failed = [product_id for product_id in product_ids if product_id not in decremented]
+    names = dict(db.query(Product.id, Product.name).filter(Product.id.in_(failed)))
+    for product_id in failed:
+        if product_id not in names:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Product not found: {product_id}")
+    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Insufficient stock for product: {names[failed[0]]}")
+
+
+def place_order(
+    db: Session,
+    user_id: str,
+    cart_items: Optional[Sequence[Any]] = None,
+    idempotency_key: Optional[str] = None,
+    fingerprint: str = "",
+) -> Tuple[Order, Dict[str, int]]:
+    """Write an order for the cart in the current transaction, without committing.
+
+    Returns the order and the units taken per product; the units are empty when an earlier
+    request with the same ``idempotency_key`` already placed the order. Once committed, pass
+    them to ``finish_order``. Raises ``HTTPException`` when the order cannot be placed.
+
+    The sales rollups pick the order up from its ORDER_PLACED event once it is committed.
+    """
+    if idempotency_key is not None:
+        # A retry gets the original order whatever the cart holds by now
+        existing = _replay(db, user_id, idempotency_key, fingerprint)
+        if existing is not None:
+            return existing, {}
+
+    if cart_items is None:
+        cart_items = cart_store.lines(db, user_id)
     if not cart_items:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cart is empty")
 
-    order_items: List[OrderItem] = []
-    total = Decimal("0")
-    
-    try:
-        # Start transaction (implicit with Session, but made explicit for clarity)
-        for item in cart_items:
-            # Access product through relationship (already loaded via joinedload)
-            product = item.product if hasattr(item, 'product') else db.get(Product, item.product_id)
-            if not product:
-                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Product not found: {item.product_id}")
-            if product.stock < item.quantity:
-                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Insufficient stock for product: {product.name}")
-
-            product.stock -= item.quantity
-            db.add(product)
-
-            order_item = OrderItem(product_id=item.product_id, qty=item.quantity, price=item.price)
-            order_items.append(order_item)
-            total += item.price * item.quantity
-
-        order = Order(user_id=user_id, items=order_items, total=total)
-        db.add(order)
-
-        # Clear cart after order creation
-        db.query(CartItem).filter(CartItem.user_id == user_id).delete()
-
-        # Append to user's order ids if needed
-        user = db.get(User, user_id)
-        if user and hasattr(user, "order_ids"):
-            # Attribute kept for parity; may not exist
-            existing = getattr(user, "order_ids") or []
-            existing.append(order.id)
-            setattr(user, "order_ids", existing)
-            db.add(user)
+    quantities: Dict[str, int] = {}
+    for item in cart_items:
+        quantities[item.product_id] = quantities.get(item.product_id, 0) + item.quantity
+
+    order_id = str(uuid4())
+    if idempotency_key is not None and not _claim_key(db, user_id, idempotency_key, fingerprint, order_id):
+        # A concurrent request with the same key placed the order first
+        return _replay(db, user_id, idempotency_key, fingerprint), {}
+
+    categories = _decrement_stock(db, user_id, quantities)
+
+    order_items = [OrderItem(product_id=item.product_id, qty=item.quantity, price=item.price) for item in cart_items]
+    total = sum((item.price * item.quantity for item in cart_items), Decimal("0"))
+    created_at = datetime.now(timezone.utc)
+    order = Order(id=order_id, user_id=user_id, items=order_items, total=total, created_at=created_at)
+    db.add(order)
+    emit_event(db, ORDER_PLACED, order_id, {
+        "orderId": order_id,
+        "userId": user_id,
+        "total": total,
+        "createdAt": created_at,
+        "items": [
+            {
+                "productId": item.product_id,
+                "qty": item.qty,
+                "price": item.price,
+                "categories": categories.get(item.product_id) or [],
+            }
+            for item in order_items
+        ],
+    })
+
+    # A database-backed cart is cleared in the order transaction; other stores are cleared
+    # only once the order is committed, so a failed checkout leaves the cart intact
+    if cart_store.transactional:
+        cart_store.clear(db, user_id, commit=False)
+    return order, quantities
+
+
+def finish_order(db: Session, user_id: str, quantities: Dict[str, int]) -> None:
+    """Side effects of a committed order placed by ``place_order``."""
+    if not quantities:
+        return
+    if not cart_store.transactional:
+        cart_store.clear(db, user_id)
+    # Stock changed, so cached copies of these products are now stale
+    for product_id, quantity in quantities.items():
+        invalidate_product(product_id)
+        suggest_index.add_popularity(product_id, quantity)
+
 
+def create_order(
+    db: Session,
+    user_id: str,
+    idempotency_key: Optional[str] = None,
+    fingerprint: str = "",
+) -> Order:
+    """Turn the user's cart into an order.
+
+    With an ``idempotency_key``, a retry of a request that already placed an order gets
+    that order back instead of checking out again.
+    """
+    try:
+        order, quantities = place_order(db, user_id, None, idempotency_key, fingerprint)
         db.commit()
+        finish_order(db, user_id, quantities)
         db.refresh(order)
         return order
     except HTTPException:
@@ -64,13 +217,42 @@ def create_order(db: Session, user_id: str) -> Order:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to create order: {str(e)}")
 
 
-def get_user_orders(db: Session, user_id: str) -> List[Order]:
-    return (
-        db.query(Order)
-        .filter(Order.user_id == user_id)
-        .order_by(Order.created_at.desc())
-        .all()
-    )
+def _history_query(db: Session, user_id: str, summary: bool):
+    # Newest first, matching ix_orders_user_created_at_id; line items come in one extra IN query
+    query = db.query(Order).filter(Order.user_id == user_id).order_by(Order.created_at.desc(), Order.id.desc())
+    if not summary:
+        query = query.options(selectinload(Order.items))
+    return query
+
+
+def get_user_orders(db: Session, user_id: str, summary: bool = False) -> List[Order]:
+    return _history_query(db, user_id, summary).all()
+
+
+def get_user_orders_page(
+    db: Session,
+    user_id: str,
+    size: int,
+    cursor: Optional[str] = None,
+    summary: bool = False,
+) -> Tuple[List[Order], Optional[str]]:
+    """Keyset page of a user's orders, newest first; returns the rows and the next cursor, if any.
+
+    With ``summary`` the line items are not loaded. Raises ``ValueError`` on a bad cursor.
+    """
+    if size <= 0:
+        return [], None
+
+    query = _history_query(db, user_id, summary)
+    if cursor:
+        values = decode_cursor(cursor, ORDER_HISTORY_SCOPE, ORDER_HISTORY_KEY)
+        query = query.filter(keyset_after(ORDER_HISTORY_KEY, values, descending=True))
+
+    rows = query.limit(size + 1).all()
+    if len(rows) <= size:
+        return rows, None
+    rows = rows[:size]
+    return rows, encode_cursor(ORDER_HISTORY_SCOPE, [rows[-1].created_at, rows[-1].id])
 
 
 def get_order(db: Session, order_id: str) -> Order:
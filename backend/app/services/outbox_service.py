@@ -0,0 +1,297 @@
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+from sqlalchemy import delete, func, literal, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from ..config import get_settings
+from ..database import SessionLocal
+from ..models import OutboxCheckpoint, OutboxEvent
+from ..pagination import keyset_after
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+ORDER_PLACED = "order.placed"
+PRODUCT_CREATED = "product.created"
+PRODUCT_UPDATED = "product.updated"
+PRODUCT_DELETED = "product.deleted"
+
+OUTBOX_KEY = (OutboxEvent.txid, OutboxEvent.id)
+# How often the dispatcher deletes events every sink has received
+PRUNE_INTERVAL_SECONDS = 300
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def emit_event(db: Session, event_type: str, aggregate_id: str, payload: Dict[str, Any]) -> None:
+    """Add an event to the outbox in the caller's transaction; the caller's commit publishes it."""
+    db.add(OutboxEvent(
+        type=event_type,
+        aggregate_id=aggregate_id,
+        payload=json.loads(json.dumps(payload, default=_json_default)),
+    ))
+
+
+def _envelope(event: OutboxEvent) -> Dict[str, Any]:
+    # Ids are stable across redeliveries, so consumers can drop duplicates by id
+    return {
+        "id": event.id,
+        "type": event.type,
+        "aggregateId": event.aggregate_id,
+        "payload": event.payload,
+        "createdAt": event.created_at.isoformat(),
+    }
+
+
+class EventSink:
+    """Somewhere outbox events are delivered, in order, in batches.
+
+    ``deliver`` must raise unless the whole batch was accepted; the batch is then retried.
+    Delivery is at least once, so a sink can see an event again after a failure or crash.
+    ``name`` keys the sink's checkpoint and must stay the same across restarts.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def deliver(self, events: List[Dict[str, Any]]) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class DatabaseSink(EventSink):
+    """Writes events into this database, in the dispatcher's transaction.
+
+    ``apply`` must not commit: its writes commit together with the checkpoint, so each
+    event is applied exactly once, and a failure rolls both back for the batch to be retried.
+    """
+
+    def apply(self, db: Session, events: List[Dict[str, Any]]) -> None:
+        raise NotImplementedError
+
+
+class CallbackSink(EventSink):
+    """Hands each batch to a function in this process."""
+
+    def __init__(self, name: str, callback: Callable[[List[Dict[str, Any]]], None]):
+        super().__init__(name)
+        self.callback = callback
+
+    def deliver(self, events: List[Dict[str, Any]]) -> None:
+        self.callback(events)
+
+
+class FileSink(EventSink):
+    """Appends events to a local NDJSON file, one event per line, synced before acknowledging."""
+
+    def __init__(self, name: str, path: str):
+        super().__init__(name)
+        self.path = path
+
+    def deliver(self, events: List[Dict[str, Any]]) -> None:
+        with open(self.path, "a", encoding="utf-8") as handle:
+            for event in events:
+                handle.write(json.dumps(event, separators=(",", ":")) + "\n")
+            handle.flush()
+            os.fsync(handle.fileno())
+
+
+class WebhookSink(EventSink):
+    """POSTs each batch as ``{"events": [...]}``; any non-2xx response fails the batch."""
+
+    def __init__(self, name: str, url: str, timeout: float = 5.0, headers: Optional[Dict[str, str]] = None):
+        super().__init__(name)
+        self.url = url
+        self._client = httpx.Client(timeout=timeout, headers=headers)
+
+    def deliver(self, events: List[Dict[str, Any]]) -> None:
+        self._client.post(self.url, json={"events": events}).raise_for_status()
+
+    def close(self) -> None:
+        self._client.close()
+
+
+def _claim_checkpoint(db: Session, sink: str) -> Optional[OutboxCheckpoint]:
+    """Lock the sink's checkpoint row, creating it at the start of the outbox if needed.
+
+    Returns None while another dispatcher (another API process) is delivering to this sink.
+    """
+    db.execute(
+        insert(OutboxCheckpoint)
+        .values(sink=sink, txid=0, event_id=0, updated_at=func.now())
+        .on_conflict_do_nothing(index_elements=[OutboxCheckpoint.sink])
+    )
+    return (
+        db.query(OutboxCheckpoint)
+        .filter(OutboxCheckpoint.sink == sink)
+        .with_for_update(skip_locked=True)
+        .one_or_none()
+    )
+
+
+def read_events(db: Session, txid: int, event_id: int, limit: int) -> List[OutboxEvent]:
+    """Events after the (txid, id) cursor, in order, from transactions that have finished.
+
+    Transactions older than the snapshot's xmin have all committed or rolled back, so no
+    event can later appear behind the cursor. A long-running transaction anywhere in the
+    database holds delivery back until it ends.
+    """
+    stmt = (
+        select(OutboxEvent)
+        .where(
+            keyset_after(OUTBOX_KEY, (txid, event_id)),
+            OutboxEvent.txid < func.txid_snapshot_xmin(func.txid_current_snapshot()),
+        )
+        .order_by(*OUTBOX_KEY)
+        .limit(limit)
+    )
+    return db.scalars(stmt).all()
+
+
+class OutboxDispatcher:
+    """Background thread delivering outbox events to registered sinks every ``interval`` seconds.
+
+    Every sink has its own checkpoint, advanced only after ``deliver`` returns (or, for a
+    ``DatabaseSink``, in the same commit as ``apply``), so a failing sink is retried from
+    where it stopped without holding up the others.
+    """
+
+    def __init__(self, batch_size: int, interval: float, retention_hours: float):
+        self.batch_size = batch_size
+        self.interval = interval
+        self.retention_hours = retention_hours
+        self.sinks: Dict[str, EventSink] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_prune = 0.0
+
+    def register(self, sink: EventSink) -> None:
+        if sink.name in self.sinks:
+            raise ValueError(f"An outbox sink named {sink.name!r} is already registered")
+        self.sinks[sink.name] = sink
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="outbox-dispatcher", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=max(self.interval, 5))
+            self._thread = None
+        for sink in self.sinks.values():
+            sink.close()
+
+    def dispatch(self, sink: EventSink) -> int:
+        """Deliver the sink's next batch and advance its checkpoint; returns the events delivered."""
+        db = SessionLocal()
+        try:
+            checkpoint = _claim_checkpoint(db, sink.name)
+            if checkpoint is None:
+                db.rollback()
+                return 0
+            events = read_events(db, checkpoint.txid, checkpoint.event_id, self.batch_size)
+            if not events:
+                db.rollback()
+                return 0
+            # The checkpoint row stays locked while delivering, so processes never race on a sink
+            envelopes = [_envelope(event) for event in events]
+            if isinstance(sink, DatabaseSink):
+                sink.apply(db, envelopes)
+            else:
+                sink.deliver(envelopes)
+            checkpoint.txid, checkpoint.event_id = events[-1].txid, events[-1].id
+            checkpoint.updated_at = datetime.now(timezone.utc)
+            db.commit()
+            return len(events)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def prune(self) -> int:
+        """Delete events older than the retention period that every registered sink has received."""
+        db = SessionLocal()
+        try:
+            stmt = select(OutboxEvent.id).where(
+                OutboxEvent.created_at < datetime.now(timezone.utc) - timedelta(hours=self.retention_hours)
+            )
+            if self.sinks:
+                checkpoints = (
+                    db.query(OutboxCheckpoint.txid, OutboxCheckpoint.event_id)
+                    .filter(OutboxCheckpoint.sink.in_(list(self.sinks)))
+                    .all()
+                )
+                if len(checkpoints) < len(self.sinks):
+                    return 0
+                # Up to and including the slowest sink's checkpoint: that event was delivered too
+                low_txid, low_event_id = min(tuple(row) for row in checkpoints)
+                stmt = stmt.where(tuple_(*OUTBOX_KEY) <= tuple_(
+                    literal(low_txid, OutboxEvent.txid.type),
+                    literal(low_event_id, OutboxEvent.id.type),
+                ))
+
+            total = 0
+            while not self._stop.is_set():
+                batch = stmt.order_by(*OUTBOX_KEY).limit(self.batch_size)
+                deleted = db.execute(delete(OutboxEvent).where(OutboxEvent.id.in_(batch))).rowcount
+                db.commit()
+                total += deleted
+                if deleted < self.batch_size:
+                    break
+            return total
+        finally:
+            db.close()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            for sink in list(self.sinks.values()):
+                try:
+                    # Keep going while full batches come back, so a backlog drains in one pass
+                    while not self._stop.is_set() and self.dispatch(sink) == self.batch_size:
+                        pass
+                except Exception:
+                    logger.exception("Delivering outbox events to %s failed; retrying", sink.name)
+            if self.retention_hours > 0 and time.monotonic() - self._last_prune >= PRUNE_INTERVAL_SECONDS:
+                self._last_prune = time.monotonic()
+                try:
+                    self.prune()
+                except Exception:
+                    logger.exception("Pruning delivered outbox events failed")
+
+
+def _create_dispatcher() -> OutboxDispatcher:
+    dispatcher = OutboxDispatcher(
+        settings.outbox_batch_size,
+        settings.outbox_poll_interval_seconds,
+        settings.outbox_retention_hours,
+    )
+    if settings.outbox_file_path:
+        dispatcher.register(FileSink("file", settings.outbox_file_path))
+    for url in settings.outbox_webhook_urls:
+        dispatcher.register(WebhookSink(f"webhook:{url}", url, settings.outbox_webhook_timeout_seconds))
+    return dispatcher
+
+
+outbox_dispatcher = _create_dispatcher()
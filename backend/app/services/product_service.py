@@ -1,32 +1,291 @@
-from typing import List, Optional
+import math
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-from sqlalchemy import or_
-from sqlalchemy.orm import Session
+from sqlalchemy import Numeric, String, cast, func, literal, or_, select, true, union_all, update
+from sqlalchemy.dialects.postgresql import ARRAY, array
+from sqlalchemy.orm import Query, Session, load_only, make_transient_to_detached
 
+from ..cache import TTLCache
+from ..config import get_settings
 from ..models import Product
+from ..models.product import SEARCH_CONFIG
+from ..pagination import decode_cursor, encode_cursor, keyset_after
+from .outbox_service import PRODUCT_CREATED, PRODUCT_DELETED, PRODUCT_UPDATED, emit_event
+from .suggest_service import suggest_index
 
+MAX_BATCH_IDS = 500
+# Lower bounds of the price ranges reported by get_facets; the last range is open-ended.
+PRICE_BUCKET_BOUNDS = (0, 25, 50, 100, 250, 500, 1000, 2500)
+PRODUCT_FIELDS = ("id", "name", "description", "categories", "price", "images", "stock", "attributes", "version")
+# What bulk statements RETURN to build product events from, without loading the rows
+PRODUCT_EVENT_COLUMNS = tuple(getattr(Product, name) for name in PRODUCT_FIELDS)
 
-def get_products(db: Session, page: int, size: int, category: Optional[str], search: Optional[str]) -> List[Product]:
+settings = get_settings()
+
+# Detached, never-attached copies of product rows keyed by id. Callers get a
+# session-bound instance through Session.merge(load=False), which costs no SQL.
+product_cache = TTLCache(settings.product_cache_size, settings.product_cache_ttl_seconds)
+
+
+def _snapshot(product: Product) -> Product:
+    copy = Product(
+        id=product.id,
+        name=product.name,
+        description=product.description,
+        categories=list(product.categories or []),
+        price=product.price,
+        images=list(product.images or []),
+        stock=product.stock,
+        reserved=product.reserved,
+        attributes=dict(product.attributes or {}),
+        version=product.version,
+        created_at=product.created_at,
+    )
+    make_transient_to_detached(copy)
+    return copy
+
+
+def product_event_payload(product: Any) -> Dict[str, Any]:
+    """Event payload for a product, or for a row returning ``PRODUCT_EVENT_COLUMNS``."""
+    return {name: getattr(product, name) for name in PRODUCT_FIELDS}
+
+
+class VersionConflictError(Exception):
+    """The product changed since the version the caller last read."""
+
+
+def invalidate_product(product_id: str) -> None:
+    product_cache.invalidate(product_id)
+
+
+def _ts_query(search: str):
+    return func.websearch_to_tsquery(SEARCH_CONFIG, search)
+
+
+def parse_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Parse a comma-separated sparse fieldset; ``id`` is always included.
+
+    Raises ``ValueError`` naming any unknown field.
+    """
+    if not fields:
+        return None
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in PRODUCT_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return tuple(dict.fromkeys(["id", *requested]))
+
+
+def _attribute_value(value: str) -> List[Any]:
+    # Query strings are untyped, so numeric values also match when stored as JSON numbers
+    try:
+        number = float(value)
+    except ValueError:
+        return [value]
+    if not math.isfinite(number):
+        return [value]
+    return [value, int(number) if number.is_integer() else number]
+
+
+@dataclass
+class ProductFilters:
+    category: Optional[str] = None
+    search: Optional[str] = None
+    attributes: Dict[str, List[str]] = field(default_factory=dict)
+    min_price: Optional[Decimal] = None
+    max_price: Optional[Decimal] = None
+
+
+# Each sort is a key ending in id, so it is total and can seed a keyset cursor, and each
+# has a matching composite btree index so ORDER BY ... LIMIT is an index scan.
+SORT_KEYS = {
+    "id": ((Product.id,), False),
+    "price": ((Product.price, Product.id), False),
+    "-price": ((Product.price, Product.id), True),
+    "name": ((Product.name, Product.id), False),
+    "newest": ((Product.created_at, Product.id), True),
+}
+DEFAULT_SORT = "id"
+
+
+def _filtered_query(db: Session, filters: ProductFilters, fields: Optional[Sequence[str]] = None) -> Query:
     query = db.query(Product)
+    if fields:
+        query = query.options(load_only(*(getattr(Product, name) for name in fields)))
+
+    if filters.search:
+        query = query.filter(Product.search_vector.op("@@")(_ts_query(filters.search)))
+
+    if filters.category:
+        query = query.filter(Product.categories.contains([filters.category]))
+
+    if filters.min_price is not None:
+        query = query.filter(Product.price >= filters.min_price)
+
+    if filters.max_price is not None:
+        query = query.filter(Product.price <= filters.max_price)
+
+    # Each attribute compiles to `attributes @> '{"key": value}'`, served by the GIN index;
+    # repeating a key matches any of its values.
+    for key, values in filters.attributes.items():
+        matches = [
+            Product.attributes.contains({key: candidate})
+            for value in values
+            for candidate in _attribute_value(value)
+        ]
+        query = query.filter(or_(*matches))
+
+    return query
 
-    if search:
-        pattern = f"%{search}%"
-        query = query.filter(or_(Product.name.ilike(pattern), Product.description.ilike(pattern)))
 
-    if category:
-        query = query.filter(Product.categories.any(category))
+def _sorted(query: Query, sort: str) -> Query:
+    if sort not in SORT_KEYS:
+        raise ValueError(f"Unknown sort: {sort}")
+    columns, descending = SORT_KEYS[sort]
+    return query.order_by(*(column.desc() if descending else column for column in columns))
 
+
+def get_products(
+    db: Session,
+    page: int,
+    size: int,
+    filters: ProductFilters,
+    fields: Optional[Sequence[str]] = None,
+    sort: Optional[str] = None,
+) -> List[Product]:
+    """Offset page. Without an explicit sort, searches rank by relevance and the rest sort by id."""
+    query = _filtered_query(db, filters, fields)
+    if filters.search and sort is None:
+        rank = func.ts_rank_cd(Product.search_vector, _ts_query(filters.search))
+        query = query.order_by(rank.desc(), Product.id)
+    else:
+        query = _sorted(query, sort or DEFAULT_SORT)
     return query.offset(page * size).limit(size).all()
 
 
+def get_products_page(
+    db: Session,
+    size: int,
+    filters: ProductFilters,
+    cursor: Optional[str] = None,
+    fields: Optional[Sequence[str]] = None,
+    sort: Optional[str] = None,
+) -> Tuple[List[Product], Optional[str]]:
+    """Keyset page; returns the rows and the cursor for the next page, if any.
+
+    Search results are filtered by the full-text match but not ranked, since relevance
+    is not a stable sort key. A cursor only continues the sort it was issued for.
+    """
+    if size <= 0:
+        return [], None
+
+    sort = sort or DEFAULT_SORT
+    if sort not in SORT_KEYS:
+        raise ValueError(f"Unknown sort: {sort}")
+    columns, descending = SORT_KEYS[sort]
+    if fields:
+        # The cursor is built from the sort key, so it must be loaded even when not requested
+        fields = tuple(dict.fromkeys([*fields, *(column.key for column in columns)]))
+
+    query = _sorted(_filtered_query(db, filters, fields), sort)
+    if cursor:
+        query = query.filter(keyset_after(columns, decode_cursor(cursor, sort, columns), descending))
+
+    rows = query.limit(size + 1).all()
+    if len(rows) <= size:
+        return rows, None
+    rows = rows[:size]
+    return rows, encode_cursor(sort, [getattr(rows[-1], column.key) for column in columns])
+
+
+def get_facets(db: Session, filters: ProductFilters) -> Dict[str, Any]:
+    """Category counts, price ranges and stock counts for the filtered catalog in one query."""
+    filtered = (
+        _filtered_query(db, filters)
+        .with_entities(Product.categories, Product.price, Product.stock, Product.reserved)
+        .cte("filtered")
+    )
+    category_name = func.unnest(filtered.c.categories).table_valued("name").render_derived()
+    bucket = func.width_bucket(
+        filtered.c.price,
+        cast(array([Decimal(bound) for bound in PRICE_BUCKET_BOUNDS]), ARRAY(Numeric)),
+    )
+
+    stmt = union_all(
+        select(literal("total"), literal(None, String), func.count()).select_from(filtered),
+        select(literal("in_stock"), literal(None, String), func.count())
+        .select_from(filtered)
+        # Units held by carts cannot be bought, so they do not count as in stock
+        .where(filtered.c.stock - filtered.c.reserved > 0),
+        select(literal("category"), category_name.c.name, func.count())
+        .select_from(filtered)
+        .join(category_name, true())
+        .group_by(category_name.c.name),
+        select(literal("price"), cast(bucket, String), func.count()).select_from(filtered).group_by(bucket),
+    )
+
+    facets: Dict[str, Any] = {"total": 0, "in_stock": 0, "categories": [], "price_ranges": []}
+    for facet, key, count in db.execute(stmt):
+        if facet in ("total", "in_stock"):
+            facets[facet] = count
+        elif facet == "category":
+            facets["categories"].append({"name": key, "count": count})
+        elif int(key) > 0:
+            index = int(key)
+            upper = PRICE_BUCKET_BOUNDS[index] if index < len(PRICE_BUCKET_BOUNDS) else None
+            facets["price_ranges"].append({"min": PRICE_BUCKET_BOUNDS[index - 1], "max": upper, "count": count})
+
+    facets["categories"].sort(key=lambda item: (-item["count"], item["name"]))
+    facets["price_ranges"].sort(key=lambda item: item["min"])
+    return facets
+
+
 def get_product(db: Session, product_id: str) -> Optional[Product]:
-    return db.get(Product, product_id)
+    cached = product_cache.get(product_id)
+    if cached is not None:
+        return db.merge(cached, load=False)
+
+    product = db.get(Product, product_id)
+    if product is not None:
+        product_cache.set(product_id, _snapshot(product))
+    return product
+
+
+def get_products_by_ids(db: Session, product_ids: Sequence[str]) -> Tuple[List[Product], List[str]]:
+    """Fetch many products with one IN query for cache misses, in the order requested.
+
+    Returns the found products and the ids that do not exist.
+    """
+    requested = list(dict.fromkeys(product_ids))
+    found: Dict[str, Product] = {}
+    to_load: List[str] = []
+    for product_id in requested:
+        cached = product_cache.get(product_id)
+        if cached is not None:
+            found[product_id] = db.merge(cached, load=False)
+        else:
+            to_load.append(product_id)
+
+    if to_load:
+        for product in db.query(Product).filter(Product.id.in_(to_load)):
+            found[product.id] = product
+            product_cache.set(product.id, _snapshot(product))
+
+    ordered = [found[product_id] for product_id in requested if product_id in found]
+    missing = [product_id for product_id in requested if product_id not in found]
+    return ordered, missing
 
 
 def create_product(db: Session, product: Product) -> Product:
     db.add(product)
+    db.flush()
+    emit_event(db, PRODUCT_CREATED, product.id, product_event_payload(product))
     db.commit()
     db.refresh(product)
+    invalidate_product(product.id)
+    suggest_index.upsert_product(product.id, product.name, product.categories)
     return product
 
 
@@ -42,15 +301,74 @@ def update_product(db: Session, product_id: str, updates: Product) -> Product:
     existing.images = updates.images
     existing.stock = updates.stock
     existing.attributes = updates.attributes
+    existing.version = Product.version + 1
 
+    # Flushing runs the UPDATE, so the event carries the new version
+    db.flush()
+    emit_event(db, PRODUCT_UPDATED, product_id, product_event_payload(existing))
     db.commit()
     db.refresh(existing)
+    invalidate_product(product_id)
+    suggest_index.upsert_product(existing.id, existing.name, existing.categories)
     return existing
 
 
+def patch_product(
+    db: Session,
+    product_id: str,
+    changes: Dict[str, Any],
+    expected_version: Optional[int] = None,
+) -> Product:
+    """Write only ``changes`` in a single UPDATE ... RETURNING and bump the version.
+
+    With ``expected_version`` the update is a compare-and-swap: it raises
+    ``VersionConflictError`` if another writer got there first. Empty ``changes`` write
+    nothing, but the version is still checked.
+    """
+    if not changes:
+        if expected_version is None:
+            product = get_product(db, product_id)
+        else:
+            # Compare against the row itself, not a cached copy another process may have outdated
+            product = db.get(Product, product_id)
+        if product is None:
+            raise ValueError("Product not found")
+        if expected_version is not None and product.version != expected_version:
+            raise VersionConflictError(product_id)
+        return product
+
+    stmt = (
+        update(Product)
+        .where(Product.id == product_id)
+        .values(**changes, version=Product.version + 1)
+        .returning(Product)
+        .execution_options(synchronize_session=False)
+    )
+    if expected_version is not None:
+        stmt = stmt.where(Product.version == expected_version)
+
+    product = db.scalars(stmt, execution_options={"populate_existing": True}).one_or_none()
+    if product is None:
+        db.rollback()
+        if db.query(Product.id).filter(Product.id == product_id).first() is None:
+            raise ValueError("Product not found")
+        raise VersionConflictError(product_id)
+
+    emit_event(db, PRODUCT_UPDATED, product_id, product_event_payload(product))
+    db.commit()
+    db.refresh(product)
+    invalidate_product(product_id)
+    if "name" in changes or "categories" in changes:
+        suggest_index.upsert_product(product.id, product.name, product.categories)
+    return product
+
+
 def delete_product(db: Session, product_id: str) -> None:
     existing = db.get(Product, product_id)
     if not existing:
         raise ValueError("Product not found")
     db.delete(existing)
+    emit_event(db, PRODUCT_DELETED, product_id, {"id": product_id})
     db.commit()
+    invalidate_product(product_id)
+    suggest_index.remove_product(product_id)
@@ -3,10 +3,11 @@ from typing import List
 from sqlalchemy.orm import Session
 
 from ..models import Product, User
+from .product_service import get_product
 
 
 def recommend_by_product(db: Session, product_id: str, limit: int = 5) -> List[Product]:
-    product = db.get(Product, product_id)
+    product = get_product(db, product_id)
     if not product:
         return []
 
@@ -0,0 +1,156 @@
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Any, Dict, List, Sequence, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from ..models import CategorySalesDaily, ProductSalesDaily
+from .outbox_service import ORDER_PLACED, DatabaseSink, outbox_dispatcher
+from .product_service import get_products_by_ids
+
+REPORT_METRICS = ("units", "revenue")
+MAX_REPORT_ROWS = 100
+# Keys the rollups' outbox checkpoint; migration 0011 starts it at the outbox head
+SALES_ROLLUP_SINK = "sales-rollups"
+
+
+@dataclass
+class SaleLine:
+    """One order line as the rollups see it, with its product's categories at checkout."""
+
+    product_id: str
+    quantity: int
+    price: Decimal
+    categories: Sequence[str]
+
+
+@dataclass
+class OrderSales:
+    """What one order adds to the rollups: its UTC day and its lines."""
+
+    day: date
+    lines: Sequence[SaleLine]
+
+
+def _upsert(db: Session, model, key: str, totals: Dict[Tuple[date, str], List[Any]]) -> None:
+    if not totals:
+        return
+    # Rows go in key order, so they are always locked in the same order
+    stmt = insert(model).values([
+        {"day": day, key: name, "units": units, "revenue": revenue, "orders": orders}
+        for (day, name), (units, revenue, orders) in sorted(totals.items())
+    ])
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[model.day, getattr(model, key)],
+        set_={
+            "units": model.units + stmt.excluded.units,
+            "revenue": model.revenue + stmt.excluded.revenue,
+            "orders": model.orders + stmt.excluded.orders,
+        },
+    ))
+
+
+def record_sales(db: Session, sales: Sequence[OrderSales]) -> None:
+    """Add orders to the daily product and category rollups with one upsert each, without committing."""
+    by_product: Dict[Tuple[date, str], List[Any]] = {}
+    by_category: Dict[Tuple[date, str], List[Any]] = {}
+    for sale in sales:
+        order_products: Dict[str, List[Any]] = {}
+        order_categories: Dict[str, List[Any]] = {}
+        for line in sale.lines:
+            revenue = line.price * line.quantity
+            _add(order_products, line.product_id, line.quantity, revenue)
+            # set() so a category listed twice on one product is counted once
+            for category in set(line.categories):
+                _add(order_categories, category, line.quantity, revenue)
+        # Each order counts once per product and category however many lines it has
+        for totals, order_totals in ((by_product, order_products), (by_category, order_categories)):
+            for name, (units, revenue) in order_totals.items():
+                entry = totals.setdefault((sale.day, name), [0, Decimal("0"), 0])
+                entry[0] += units
+                entry[1] += revenue
+                entry[2] += 1
+    _upsert(db, ProductSalesDaily, "product_id", by_product)
+    _upsert(db, CategorySalesDaily, "category", by_category)
+
+
+def _order_sales(payload: Dict[str, Any]) -> OrderSales:
+    day = datetime.fromisoformat(payload["createdAt"]).astimezone(timezone.utc).date()
+    return OrderSales(day, [
+        SaleLine(item["productId"], item["qty"], Decimal(item["price"]), item.get("categories") or ())
+        for item in payload["items"]
+    ])
+
+
+class SalesRollupSink(DatabaseSink):
+    """Feeds placed orders from the outbox into the daily rollups.
+
+    Checkout never touches the shared rollup rows, so hot days and categories do not
+    serialize orders; the reports trail checkout by up to the dispatcher's poll interval.
+    """
+
+    def apply(self, db: Session, events: List[Dict[str, Any]]) -> None:
+        record_sales(db, [_order_sales(event["payload"]) for event in events if event["type"] == ORDER_PLACED])
+
+
+def _add(totals: Dict[str, List[Any]], name: str, units: int, revenue: Decimal) -> None:
+    entry = totals.setdefault(name, [0, Decimal("0")])
+    entry[0] += units
+    entry[1] += revenue
+
+
+def _totals(model, key, start: date, end: date):
+    return (
+        select(
+            key,
+            func.sum(model.units).label("units"),
+            func.sum(model.revenue).label("revenue"),
+            func.sum(model.orders).label("orders"),
+        )
+        .where(model.day.between(start, end))
+        .group_by(key)
+    )
+
+
+def top_sellers(db: Session, start: date, end: date, limit: int = 10, by: str = "units") -> List[Dict[str, Any]]:
+    """Best-selling products between ``start`` and ``end`` (inclusive), read from the daily rollup.
+
+    The rollup is fed from the outbox, so the latest orders can take a poll interval to appear.
+
+    ``by`` ranks on "units" or "revenue". Raises ``ValueError`` for any other metric.
+    """
+    if by not in REPORT_METRICS:
+        raise ValueError(f"Unknown metric {by!r}; expected one of {', '.join(REPORT_METRICS)}")
+    stmt = _totals(ProductSalesDaily, ProductSalesDaily.product_id, start, end)
+    stmt = stmt.order_by(func.sum(getattr(ProductSalesDaily, by)).desc(), ProductSalesDaily.product_id).limit(limit)
+    rows = db.execute(stmt).all()
+
+    # Names come from the product cache; deleted products keep their sales but have no name
+    products, _ = get_products_by_ids(db, [row.product_id for row in rows])
+    names = {product.id: product.name for product in products}
+    return [
+        {
+            "productId": row.product_id,
+            "name": names.get(row.product_id),
+            "units": row.units,
+            "revenue": row.revenue,
+            "orders": row.orders,
+        }
+        for row in rows
+    ]
+
+
+def revenue_by_category(db: Session, start: date, end: date) -> List[Dict[str, Any]]:
+    """Revenue per category between ``start`` and ``end`` (inclusive), highest first."""
+    stmt = _totals(CategorySalesDaily, CategorySalesDaily.category, start, end)
+    stmt = stmt.order_by(func.sum(CategorySalesDaily.revenue).desc(), CategorySalesDaily.category)
+    return [
+        {"category": row.category, "units": row.units, "revenue": row.revenue, "orders": row.orders}
+        for row in db.execute(stmt)
+    ]
+
+
+outbox_dispatcher.register(SalesRollupSink(SALES_ROLLUP_SINK))
@@ -0,0 +1,284 @@
+import logging
+import threading
+from datetime import timedelta
+from typing import Dict, Optional, Sequence
+from uuid import uuid4
+
+from fastapi import HTTPException, status
+from sqlalchemy import Integer, String, column, delete, func, select, update, values
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from ..config import get_settings
+from ..database import SessionLocal
+from ..models import Product, StockHold
+from .product_service import invalidate_product
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# Everything here locks products (in id order) before their stock_holds rows, the same order
+# as checkout, so cart writes, checkouts and the sweeper cannot deadlock on a hold and its product.
+
+
+def holds_enabled() -> bool:
+    return settings.stock_hold_ttl_seconds > 0
+
+
+def lock_products(db: Session, product_ids: Sequence[str]) -> None:
+    """Lock product rows in id order, before any hold on them, so writers cannot deadlock."""
+    if product_ids:
+        db.execute(select(Product.id).where(Product.id.in_(product_ids)).order_by(Product.id).with_for_update())
+
+
+def lock_holds(db: Session, owners: Sequence[str]) -> None:
+    """Lock the holds of several carts up front; call after locking their products."""
+    if owners:
+        db.execute(select(StockHold.id).where(StockHold.owner.in_(owners)).order_by(StockHold.id).with_for_update())
+
+
+def place_holds(db: Session, owner: str, quantities: Dict[str, int]) -> None:
+    """Reserve units for a cart, topping up and extending any holds it already has.
+
+    Raises a 400 and reserves nothing if a product is missing or fewer units are available
+    (stock minus active holds) than requested.
+    """
+    product_ids = sorted(quantities)
+    lock_products(db, product_ids)
+    requested = values(column("id", String), column("qty", Integer), name="requested").data(
+        [(product_id, quantities[product_id]) for product_id in product_ids]
+    )
+    stmt = (
+        update(Product)
+        .where(Product.id == requested.c.id, Product.stock - Product.reserved >= requested.c.qty)
+        .values(reserved=Product.reserved + requested.c.qty)
+        .returning(Product.id)
+        .execution_options(synchronize_session=False)
+    )
+    reserved = set(db.scalars(stmt))
+    if len(reserved) < len(product_ids):
+        db.rollback()
+        found = {product_id for (product_id,) in db.query(Product.id).filter(Product.id.in_(product_ids))}
+        missing = [product_id for product_id in product_ids if product_id not in found]
+        detail = (
+            f"Product not found: {', '.join(missing)}"
+            if missing
+            else f"Insufficient stock: {', '.join(product_id for product_id in product_ids if product_id not in reserved)}"
+        )
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+    # Only now that every product exists and has the units reserved are the holds written
+    expires_at = func.now() + timedelta(seconds=settings.stock_hold_ttl_seconds)
+    holds = insert(StockHold).values([
+        {"id": str(uuid4()), "owner": owner, "product_id": product_id, "quantity": quantities[product_id],
+         "expires_at": expires_at}
+        for product_id in product_ids
+    ])
+    db.execute(holds.on_conflict_do_update(
+        index_elements=[StockHold.owner, StockHold.product_id],
+        set_={"quantity": StockHold.quantity + holds.excluded.quantity, "expires_at": holds.excluded.expires_at},
+    ))
+    db.commit()
+    for product_id in product_ids:
+        invalidate_product(product_id)
+
+
+def release_holds(db: Session, owner: str, product_ids: Optional[Sequence[str]] = None) -> None:
+    """Drop a cart's holds (all of them, or those on ``product_ids``) and free the units."""
+    held = select(StockHold.product_id).where(StockHold.owner == owner)
+    if product_ids is not None:
+        held = held.where(StockHold.product_id.in_(product_ids))
+    locked = sorted(set(db.scalars(held)))
+    if not locked:
+        return
+    lock_products(db, locked)
+
+    released = (
+        delete(StockHold)
+        .where(StockHold.owner == owner, StockHold.product_id.in_(locked))
+        .returning(StockHold.product_id, StockHold.quantity)
+        .cte("released")
+    )
+
+    stmt = (
+        update(Product)
+        .where(Product.id == released.c.product_id)
+        .values(reserved=Product.reserved - released.c.quantity)
+        .returning(Product.id)
+        .execution_options(synchronize_session=False)
+    )
+    freed = db.scalars(stmt).all()
+    db.commit()
+    for product_id in freed:
+        invalidate_product(product_id)
+
+
+def release_units(db: Session, owner: str, quantities: Dict[str, int]) -> None:
+    """Give back units a cart reserved, taking them off its holds rather than dropping them.
+
+    Undoes one ``place_holds`` call that merged into holds the cart already had; a hold left
+    with no units is deleted.
+    """
+    product_ids = sorted(quantities)
+    lock_products(db, product_ids)
+    held = dict(db.execute(
+        select(StockHold.product_id, StockHold.quantity)
+        .where(StockHold.owner == owner, StockHold.product_id.in_(product_ids))
+        .with_for_update()
+    ).all())
+    # The sweeper or a checkout may have taken the hold since, so never give back more than is left
+    freed = {
+        product_id: min(quantities[product_id], held[product_id]) for product_id in product_ids if held.get(product_id)
+    }
+    if not freed:
+        db.rollback()
+        return
+
+    emptied = [product_id for product_id, quantity in freed.items() if quantity >= held[product_id]]
+    if emptied:
+        db.execute(delete(StockHold).where(StockHold.owner == owner, StockHold.product_id.in_(emptied)))
+    lowered = [(product_id, quantity) for product_id, quantity in freed.items() if product_id not in emptied]
+    if lowered:
+        rows = values(column("id", String), column("qty", Integer), name="lowered").data(lowered)
+        db.execute(
+            update(StockHold)
+            .where(StockHold.owner == owner, StockHold.product_id == rows.c.id)
+            .values(quantity=StockHold.quantity - rows.c.qty)
+            .execution_options(synchronize_session=False)
+        )
+    rows = values(column("id", String), column("qty", Integer), name="freed").data(list(freed.items()))
+    db.execute(
+        update(Product)
+        .where(Product.id == rows.c.id)
+        .values(reserved=Product.reserved - rows.c.qty)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    for product_id in freed:
+        invalidate_product(product_id)
+
+
+def consume_holds(db: Session, owner: str, product_ids: Sequence[str]) -> Dict[str, int]:
+    """Delete a cart's holds at checkout and return the units each one held.
+
+    Does not commit: the caller locks the products first and takes the units off ``reserved``
+    in the same transaction.
+    Expired holds the sweeper has not reached yet are still counted in ``reserved``, so they
+    are consumed too.
+    """
+    stmt = (
+        delete(StockHold)
+        .where(StockHold.owner == owner, StockHold.product_id.in_(product_ids))
+        .returning(StockHold.product_id, StockHold.quantity)
+    )
+    return dict(db.execute(stmt).all())
+
+
+def sweep_expired_holds(db: Session, batch_size: int) -> int:
+    """Release up to ``batch_size`` expired holds; returns how many were released.
+
+    The products of the oldest expired holds are locked in id order first, with SKIP LOCKED,
+    so the sweeper keeps the products-before-holds order and never waits on a checkout or
+    cart write; holds on products that are busy are left for the next pass. Holds are claimed
+    with SKIP LOCKED too, so several sweepers (one per worker process) split the backlog.
+    """
+    oldest = (
+        select(StockHold.product_id)
+        .where(StockHold.expires_at < func.now())
+        .order_by(StockHold.expires_at)
+        .limit(batch_size)
+        .subquery()
+    )
+    product_ids = db.scalars(
+        select(Product.id)
+        .where(Product.id.in_(select(oldest.c.product_id)))
+        .order_by(Product.id)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not product_ids:
+        db.rollback()
+        return 0
+
+    expired = (
+        select(StockHold.id)
+        .where(StockHold.expires_at < func.now(), StockHold.product_id.in_(product_ids))
+        .order_by(StockHold.expires_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .cte("expired")
+    )
+    released = (
+        delete(StockHold)
+        .where(StockHold.id.in_(select(expired.c.id)))
+        .returning(StockHold.product_id, StockHold.quantity)
+        .cte("released")
+    )
+    totals = (
+        select(
+            released.c.product_id,
+            func.sum(released.c.quantity).label("quantity"),
+            func.count().label("holds"),
+        )
+        .group_by(released.c.product_id)
+        .subquery("totals")
+    )
+    stmt = (
+        update(Product)
+        .where(Product.id == totals.c.product_id)
+        .values(reserved=Product.reserved - totals.c.quantity)
+        .returning(Product.id, totals.c.holds)
+        .execution_options(synchronize_session=False)
+    )
+    freed = db.execute(stmt).all()
+    db.commit()
+    for product_id, _ in freed:
+        invalidate_product(product_id)
+    return sum(holds for _, holds in freed)
+
+
+class HoldSweeper:
+    """Background thread that releases expired holds every ``interval`` seconds."""
+
+    def __init__(self, interval: float, batch_size: int):
+        self.interval = interval
+        self.batch_size = batch_size
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="stock-hold-sweeper", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval)
+            self._thread = None
+
+    def sweep(self) -> int:
+        """Release every currently expired hold, one batch per transaction."""
+        db = SessionLocal()
+        try:
+            total = 0
+            while not self._stop.is_set():
+                released = sweep_expired_holds(db, self.batch_size)
+                total += released
+                if released < self.batch_size:
+                    break
+            return total
+        finally:
+            db.close()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.sweep()
+            except Exception:
+                # e.g. the database being unavailable; the next pass retries
+                logger.exception("Releasing expired stock holds failed")
+
+
+hold_sweeper = HoldSweeper(settings.stock_hold_sweep_interval_seconds, settings.stock_hold_sweep_batch_size)
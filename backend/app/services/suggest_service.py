@@ -0,0 +1,339 @@
+import heapq
+import threading
+from bisect import bisect_left, insort
+from collections import Counter
+from itertools import groupby
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..models import OrderItem, Product
+
+# Names are indexed from their start and from each later word, so "pro" finds "MacBook Pro".
+MAX_WORDS_INDEXED = 6
+# Prefixes matching more keys than this keep a memoized top list that is patched in place on
+# every change; short prefixes are precomputed when the index is rebuilt.
+SCAN_LIMIT = 256
+WARM_PREFIX_LENGTH = 3
+# Upserts of at least this many rows (import chunks) merge their keys into the array in one
+# pass; smaller ones insert each key in place, which is far cheaper than copying a large index.
+BULK_MERGE_ROWS = 256
+DEFAULT_SUGGESTIONS = 10
+MAX_SUGGESTIONS = 50
+
+
+@dataclass
+class Suggestion:
+    text: str
+    type: str
+    product_id: Optional[str] = None
+    popularity: int = 0
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.casefold().split())
+
+
+def _rank(entry: Suggestion) -> Tuple[int, int]:
+    return entry.popularity, -len(entry.text)
+
+
+def _index_keys(text: str) -> List[str]:
+    words = _normalize(text).split(" ")
+    keys = (" ".join(words[start:]) for start in range(min(len(words), MAX_WORDS_INDEXED)))
+    return list(dict.fromkeys(key for key in keys if key))
+
+
+class PrefixIndex:
+    """In-memory typeahead index: a sorted array of (key, entry id) searched with bisect."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._keys: List[Tuple[str, str]] = []
+        self._entries: Dict[str, Suggestion] = {}
+        self._entry_keys: Dict[str, List[str]] = {}
+        self._category_counts: Counter = Counter()
+        self._product_categories: Dict[str, Sequence[str]] = {}
+        self._memo: Dict[str, List[Suggestion]] = {}
+        # Key changes staged by a bulk upsert, and top lists to refill, applied by _flush
+        self._bulk = False
+        self._added_keys: Set[Tuple[str, str]] = set()
+        self._removed_keys: Set[Tuple[str, str]] = set()
+        self._stale: Set[str] = set()
+
+    def rebuild(self, products: Iterable[Tuple[str, str, Sequence[str], int]]) -> None:
+        """Replace the index with ``(id, name, categories, popularity)`` rows."""
+        entries: Dict[str, Suggestion] = {}
+        entry_keys: Dict[str, List[str]] = {}
+        category_counts: Counter = Counter()
+        product_categories: Dict[str, Sequence[str]] = {}
+
+        for product_id, name, categories, popularity in products:
+            entry_id = f"product:{product_id}"
+            entries[entry_id] = Suggestion(name, "product", product_id, popularity or 0)
+            entry_keys[entry_id] = _index_keys(name)
+            product_categories[product_id] = list(categories or [])
+            category_counts.update(set(categories or []))
+
+        for category, count in category_counts.items():
+            entry_id = f"category:{category}"
+            entries[entry_id] = Suggestion(category, "category", None, count)
+            entry_keys[entry_id] = _index_keys(category)
+
+        keys = sorted((key, entry_id) for entry_id, index_keys in entry_keys.items() for key in index_keys)
+        with self._lock:
+            self._keys = keys
+            self._entries = entries
+            self._entry_keys = entry_keys
+            self._category_counts = category_counts
+            self._product_categories = product_categories
+            self._memo = self._warm(keys, entries)
+            self._added_keys, self._removed_keys, self._stale = set(), set(), set()
+
+    def upsert_product(self, product_id: str, name: str, categories: Sequence[str]) -> None:
+        self.upsert_products([(product_id, name, categories)])
+
+    def upsert_products(self, products: Iterable[Tuple[str, str, Sequence[str]]]) -> None:
+        """Add or replace ``(id, name, categories)`` rows under one lock.
+
+        At least BULK_MERGE_ROWS rows merge their keys into the index in one pass.
+        """
+        rows = list(products)
+        with self._lock:
+            self._bulk = len(rows) >= BULK_MERGE_ROWS
+            try:
+                for product_id, name, categories in rows:
+                    entry_id = f"product:{product_id}"
+                    existing = self._entries.get(entry_id)
+                    popularity = existing.popularity if existing else 0
+                    self._remove_entry(entry_id)
+                    self._set_categories(product_id, list(categories or []))
+                    self._add_entry(entry_id, Suggestion(name, "product", product_id, popularity))
+            finally:
+                self._bulk = False
+                self._flush()
+
+    def remove_product(self, product_id: str) -> None:
+        with self._lock:
+            self._remove_entry(f"product:{product_id}")
+            self._set_categories(product_id, [])
+            self._flush()
+
+    def add_popularity(self, product_id: str, amount: int) -> None:
+        with self._lock:
+            entry = self._entries.get(f"product:{product_id}")
+            if entry is not None and amount:
+                entry.popularity += amount
+                if amount > 0:
+                    self._promote(f"product:{product_id}")
+                else:
+                    self._forget(f"product:{product_id}")
+                    self._flush()
+
+    def suggest(self, prefix: str, limit: int = DEFAULT_SUGGESTIONS) -> List[Suggestion]:
+        prefix = _normalize(prefix)
+        if not prefix or limit <= 0:
+            return []
+        with self._lock:
+            return self._lookup(prefix)[: min(limit, MAX_SUGGESTIONS)]
+
+    @staticmethod
+    def _warm(keys: List[Tuple[str, str]], entries: Dict[str, Suggestion]) -> Dict[str, List[Suggestion]]:
+        """Top lists for every prefix up to WARM_PREFIX_LENGTH, from one pass over the sorted keys.
+
+        The top list of a prefix is the top of its one-character-longer children's lists plus any
+        key equal to the prefix itself, so each shorter level is merged from the level below.
+        """
+        tops: Dict[str, List[Suggestion]] = {}
+        for group, items in groupby(keys, key=lambda item: item[0][:WARM_PREFIX_LENGTH]):
+            members = {entry_id: entries[entry_id] for _, entry_id in items}
+            tops[group] = heapq.nlargest(MAX_SUGGESTIONS, members.values(), key=_rank)
+
+        for length in range(WARM_PREFIX_LENGTH - 1, 0, -1):
+            merged: Dict[str, Dict[int, Suggestion]] = {}
+            for prefix, top in tops.items():
+                if len(prefix) in (length, length + 1):
+                    bucket = merged.setdefault(prefix[:length], {})
+                    bucket.update((id(entry), entry) for entry in top)
+            for prefix, bucket in merged.items():
+                tops[prefix] = heapq.nlargest(MAX_SUGGESTIONS, bucket.values(), key=_rank)
+        return tops
+
+    # The helpers below expect the lock to be held.
+
+    def _lookup(self, prefix: str) -> List[Suggestion]:
+        memoized = self._memo.get(prefix)
+        if memoized is not None:
+            return memoized
+
+        start = bisect_left(self._keys, (prefix,))
+        end = bisect_left(self._keys, (prefix + "\uffff",))
+        entry_ids = {entry_id for _, entry_id in self._keys[start:end]}
+        top = heapq.nlargest(MAX_SUGGESTIONS, (self._entries[entry_id] for entry_id in entry_ids), key=_rank)
+        if end - start > SCAN_LIMIT:
+            self._memo[prefix] = top
+        return top
+
+    def _add_entry(self, entry_id: str, suggestion: Suggestion) -> None:
+        self._entries[entry_id] = suggestion
+        self._entry_keys[entry_id] = _index_keys(suggestion.text)
+        for key in self._entry_keys[entry_id]:
+            item = (key, entry_id)
+            if not self._bulk:
+                insort(self._keys, item)
+            elif item in self._removed_keys:
+                self._removed_keys.discard(item)
+            else:
+                self._added_keys.add(item)
+        self._promote(entry_id)
+
+    def _remove_entry(self, entry_id: str) -> None:
+        if entry_id not in self._entries:
+            return
+        self._forget(entry_id, removed=True)
+        for key in self._entry_keys.pop(entry_id):
+            item = (key, entry_id)
+            if not self._bulk:
+                position = bisect_left(self._keys, item)
+                if position < len(self._keys) and self._keys[position] == item:
+                    del self._keys[position]
+            elif item in self._added_keys:
+                self._added_keys.discard(item)
+            else:
+                self._removed_keys.add(item)
+        del self._entries[entry_id]
+
+    def _flush(self) -> None:
+        """Merge keys staged by a bulk upsert, then refill the top lists left short."""
+        if self._added_keys or self._removed_keys:
+            kept = (item for item in self._keys if item not in self._removed_keys)
+            self._keys = list(heapq.merge(kept, sorted(self._added_keys)))
+            self._added_keys, self._removed_keys = set(), set()
+        # Longest first, so a prefix is refilled from children that are already whole
+        for prefix in sorted(self._stale, key=len, reverse=True):
+            top = self._memo.get(prefix)
+            if top is not None:
+                top[:] = self._refill(prefix)
+        self._stale = set()
+
+    def _refill(self, prefix: str) -> List[Suggestion]:
+        """Recompute a memoized prefix's top list.
+
+        A prefix shorter than WARM_PREFIX_LENGTH matches the most keys but has all its children
+        memoized, so it takes the best of their sorted lists instead of scanning its range.
+        """
+        start = bisect_left(self._keys, (prefix,))
+        end = bisect_left(self._keys, (prefix + "\uffff",))
+        if len(prefix) >= WARM_PREFIX_LENGTH:
+            entry_ids = {entry_id for _, entry_id in self._keys[start:end]}
+            return heapq.nlargest(MAX_SUGGESTIONS, (self._entries[entry_id] for entry_id in entry_ids), key=_rank)
+
+        lists: List[List[Suggestion]] = []
+        position = start
+        while position < end:
+            key, entry_id = self._keys[position]
+            if len(key) == len(prefix):
+                # The prefix is itself a key, which sorts before its children
+                lists.append([self._entries[entry_id]])
+                position += 1
+                continue
+            child = key[: len(prefix) + 1]
+            lists.append(self._lookup(child))
+            position = bisect_left(self._keys, (child + "\uffff",), position, end)
+
+        top: List[Suggestion] = []
+        seen: Set[int] = set()
+        # An entry indexed under several children comes up once per child
+        for entry in heapq.merge(*lists, key=_rank, reverse=True):
+            if id(entry) not in seen:
+                seen.add(id(entry))
+                top.append(entry)
+                if len(top) >= MAX_SUGGESTIONS:
+                    break
+        return top
+
+    def _set_categories(self, product_id: str, categories: List[str]) -> None:
+        old = set(self._product_categories.pop(product_id, []))
+        new = set(categories)
+        if categories:
+            self._product_categories[product_id] = categories
+        for category in old - new:
+            self._category_counts[category] -= 1
+            entry_id = f"category:{category}"
+            if self._category_counts[category] <= 0:
+                del self._category_counts[category]
+                self._remove_entry(entry_id)
+            else:
+                self._entries[entry_id].popularity = self._category_counts[category]
+                self._forget(entry_id)
+        for category in new - old:
+            self._category_counts[category] += 1
+            entry_id = f"category:{category}"
+            if entry_id in self._entries:
+                self._entries[entry_id].popularity = self._category_counts[category]
+                self._promote(entry_id)
+            else:
+                self._add_entry(entry_id, Suggestion(category, "category", None, 1))
+
+    def _prefixes(self, entry_id: str) -> Iterable[str]:
+        for key in self._entry_keys.get(entry_id, []):
+            for end in range(1, len(key) + 1):
+                if key[:end] in self._memo:
+                    yield key[:end]
+
+    def _promote(self, entry_id: str) -> None:
+        # An entry that was added or gained popularity can only push others out of a top list
+        entry = self._entries[entry_id]
+        for prefix in list(self._prefixes(entry_id)):
+            top = self._memo[prefix]
+            if entry not in top:
+                if len(top) >= MAX_SUGGESTIONS and _rank(entry) <= _rank(top[-1]):
+                    continue
+                top.append(entry)
+            top.sort(key=_rank, reverse=True)
+            del top[MAX_SUGGESTIONS:]
+
+    def _forget(self, entry_id: str, removed: bool = False) -> None:
+        # A shorter list than MAX_SUGGESTIONS holds every entry under its prefix, so it only needs
+        # the entry dropped or moved down. A full list keeps a demoted entry that still outranks
+        # another member; otherwise the entry leaves a hole, refilled once the update is applied.
+        entry = self._entries.get(entry_id)
+        for prefix in list(self._prefixes(entry_id)):
+            top = self._memo[prefix]
+            if not any(member is entry for member in top):
+                continue
+            others = [member for member in top if member is not entry]
+            if len(top) < MAX_SUGGESTIONS:
+                if removed:
+                    top[:] = others
+                else:
+                    top.sort(key=_rank, reverse=True)
+            elif not removed and others and _rank(entry) >= _rank(others[-1]):
+                top.sort(key=_rank, reverse=True)
+            else:
+                top[:] = others
+                self._stale.add(prefix)
+
+
+suggest_index = PrefixIndex()
+
+
+def rebuild_suggest_index(db: Session) -> None:
+    """Load product names, categories and units sold into the typeahead index."""
+    sold = (
+        db.query(OrderItem.product_id, func.sum(OrderItem.qty).label("units"))
+        .group_by(OrderItem.product_id)
+        .subquery()
+    )
+    rows = (
+        db.query(Product.id, Product.name, Product.categories, func.coalesce(sold.c.units, 0))
+        .outerjoin(sold, sold.c.product_id == Product.id)
+        .yield_per(5000)
+    )
+    suggest_index.rebuild((product_id, name, categories, int(units)) for product_id, name, categories, units in rows)
+
+
+def suggest(prefix: str, limit: int = DEFAULT_SUGGESTIONS) -> List[Suggestion]:
+    return suggest_index.suggest(prefix, limit)
@@ -0,0 +1,186 @@
+"""
+Concurrency harness for checkout: many buyers race for a hot product with limited stock
+Run this script: python bench_checkout.py [--buyers 200] [--stock 50] [--workers 32] [--mode all]
+
+Each buyer gets a cart holding the hot product and all of them check out at once.
+"inline" runs the real create_order on each request thread (one conditional UPDATE ... WHERE
+stock >= qty); "queued" submits to a CheckoutQueue whose workers place checkouts in
+micro-batched transactions; "naive" runs the old read, check in Python, write back sequence
+for comparison.
+The run fails if more units were sold than were in stock or the final stock disagrees
+with the orders placed. Test users, orders, the product, and the orders' outbox events and
+rollup sales are deleted afterwards.
+"""
+import argparse
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from pathlib import Path
+from uuid import uuid4
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent))
+
+from fastapi import HTTPException
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.database import Base, SessionLocal, engine
+from app.models import Order, OrderItem, OutboxCheckpoint, OutboxEvent, Product, ProductSalesDaily, User
+from app.services import create_order, invalidate_product
+from app.services.cart_store import cart_store
+from app.services.checkout_queue import CheckoutQueue
+from app.services.report_service import SALES_ROLLUP_SINK
+
+PRICE = Decimal("9.99")
+
+
+def naive_checkout(db: Session, user_id: str, product_id: str, quantity: int) -> None:
+    # The pre-fix sequence: the stock check and the write are separate, unlocked steps
+    product = db.get(Product, product_id)
+    if product.stock < quantity:
+        raise HTTPException(status_code=400, detail="Insufficient stock")
+    product.stock -= quantity
+    db.add(Order(user_id=user_id, total=product.price * quantity, items=[
+        OrderItem(product_id=product_id, qty=quantity, price=product.price),
+    ]))
+    db.commit()
+
+
+def setup(buyers: int, stock: int, quantity: int):
+    db = SessionLocal()
+    try:
+        product = Product(
+            id=f"bench-{uuid4()}",
+            name="Checkout benchmark item",
+            categories=[],
+            price=PRICE,
+            images=[],
+            stock=stock,
+            attributes={},
+        )
+        users = [
+            User(email=f"bench-{uuid4()}@example.invalid", password_hash="!", roles=[], preferences=[])
+            for _ in range(buyers)
+        ]
+        db.add(product)
+        db.add_all(users)
+        db.commit()
+        user_ids = [user.id for user in users]
+        # Fill carts through the store directly: with holds on, only the first buyers could
+        # reserve stock, and the point here is to race checkouts themselves
+        for user_id in user_ids:
+            cart_store.add_items(db, user_id, {product.id: quantity})
+        return product.id, user_ids
+    finally:
+        db.close()
+
+
+def teardown(product_id: str, user_ids):
+    db = SessionLocal()
+    try:
+        # Wait out a dispatcher applying a batch, so the bench's sales cannot land after the cleanup
+        db.query(OutboxCheckpoint).filter(OutboxCheckpoint.sink == SALES_ROLLUP_SINK).with_for_update().all()
+        order_ids = db.query(Order.id).filter(Order.user_id.in_(user_ids))
+        db.query(OutboxEvent).filter(OutboxEvent.aggregate_id.in_(order_ids)).delete(synchronize_session=False)
+        # The product has no categories, so its sales only ever reach the product rollup
+        db.query(ProductSalesDaily).filter(ProductSalesDaily.product_id == product_id).delete(synchronize_session=False)
+        db.query(User).filter(User.id.in_(user_ids)).delete(synchronize_session=False)
+        db.query(Product).filter(Product.id == product_id).delete(synchronize_session=False)
+        db.commit()
+        invalidate_product(product_id)
+    finally:
+        db.close()
+
+
+def run(mode: str, buyers: int, stock: int, quantity: int, workers: int, queue_workers: int, batch_size: int) -> bool:
+    product_id, user_ids = setup(buyers, stock, quantity)
+    checkout_queue = None
+    if mode == "queued":
+        checkout_queue = CheckoutQueue(queue_workers, batch_size, batch_window=0.005, max_queued=buyers, job_ttl=600)
+        checkout_queue.start()
+    latencies = []
+    outcomes = {"placed": 0, "sold out": 0, "error": 0}
+    lock = threading.Lock()
+    start_line = threading.Barrier(min(workers, buyers))
+
+    def checkout(user_id: str):
+        db = SessionLocal()
+        try:
+            try:
+                start_line.wait(timeout=5)
+            except threading.BrokenBarrierError:
+                pass
+            started = time.perf_counter()
+            try:
+                if mode == "naive":
+                    naive_checkout(db, user_id, product_id, quantity)
+                elif mode == "queued":
+                    job = checkout_queue.submit(user_id)
+                    job.done.wait(60)
+                    if job.status != "placed":
+                        raise HTTPException(status_code=job.status_code or 500, detail=job.error)
+                else:
+                    create_order(db, user_id)
+                outcome = "placed"
+            except HTTPException as exc:
+                db.rollback()
+                outcome = "sold out" if exc.status_code == 400 else "error"
+            with lock:
+                latencies.append((time.perf_counter() - started) * 1000)
+                outcomes[outcome] += 1
+        finally:
+            db.close()
+
+    began = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(checkout, user_ids))
+    elapsed = time.perf_counter() - began
+    if checkout_queue is not None:
+        checkout_queue.stop()
+
+    db = SessionLocal()
+    try:
+        final_stock = db.query(Product.stock).filter(Product.id == product_id).scalar()
+        sold = db.query(func.coalesce(func.sum(OrderItem.qty), 0)).filter(OrderItem.product_id == product_id).scalar()
+    finally:
+        db.close()
+    teardown(product_id, user_ids)
+
+    consistent = sold <= stock and final_stock == stock - sold
+    print(f"{mode}: {buyers} buyers x {quantity} unit(s), {stock} in stock, {workers} workers"
+          + (f", {queue_workers} queue workers batching up to {batch_size}" if mode == "queued" else ""))
+    print(f"    {outcomes['placed']} placed, {outcomes['sold out']} sold out, {outcomes['error']} errors")
+    print(f"    {buyers / elapsed:.0f} checkouts/s, median {statistics.median(latencies):.1f} ms, "
+          f"max {max(latencies):.1f} ms")
+    print(f"    units sold {sold}, final stock {final_stock}: "
+          f"{'consistent' if consistent else 'OVERSOLD or lost updates'}")
+    return consistent
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Race concurrent checkouts for one hot product")
+    parser.add_argument("--buyers", type=int, default=200, help="concurrent buyers")
+    parser.add_argument("--stock", type=int, default=50, help="units of the hot product in stock")
+    parser.add_argument("--quantity", type=int, default=1, help="units in each buyer's cart")
+    parser.add_argument("--workers", type=int, default=32, help="threads checking out at once")
+    parser.add_argument("--queue-workers", type=int, default=4, help="CheckoutQueue worker threads")
+    parser.add_argument("--batch-size", type=int, default=32, help="most checkouts per queued transaction")
+    parser.add_argument("--mode", choices=["naive", "inline", "queued", "all"], default="all")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    modes = ["naive", "inline", "queued"] if args.mode == "all" else [args.mode]
+    results = {
+        mode: run(mode, args.buyers, args.stock, args.quantity, args.workers, args.queue_workers, args.batch_size)
+        for mode in modes
+    }
+    # Only the real checkout paths have to be consistent; the naive one is there to show the race
+    return 0 if all(ok for mode, ok in results.items() if mode != "naive") else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+"""
+Benchmark the catalog queries and check that Postgres serves them from the expected indexes
+(filters through GIN indexes, listing sorts as ordered index scans without a Sort step)
+Run this script: python explain_queries.py [--seed 200000] [--runs 5]
+
+--seed appends that many synthetic products first, so plans reflect a large catalog
+(on a tiny table the planner rightly prefers sequential scans).
+tests/test_query_plans.py asserts the same index choices in the test suite.
+"""
+import argparse
+import random
+import statistics
+import sys
+from pathlib import Path
+from uuid import uuid4
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent))
+
+from sqlalchemy import text
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app.database import SessionLocal
+from app.services import product_service
+from app.services.import_service import _upsert
+
+BRANDS = ["Apple", "Dell", "Lenovo", "ASUS", "Sony", "Samsung", "HP", "Acer", "LG", "Bose"]
+CATEGORIES = ["Electronics", "Computers", "Laptops", "Audio", "Gaming", "Smartphones", "Home", "Office"]
+WORDS = ["pro", "max", "ultra", "wireless", "gaming", "studio", "compact", "smart", "premium", "portable"]
+
+
+class Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+ProductFilters = product_service.ProductFilters
+
+
+def _listing(db: Session, sort: str, filters: ProductFilters = None):
+    return product_service._sorted(product_service._filtered_query(db, filters or ProductFilters()), sort).limit(100)
+
+
+# (name, query builder, indexes any one of which the plan must use, whether an explicit Sort node fails the check)
+CHECKS = [
+    (
+        "full-text search",
+        lambda db: product_service._filtered_query(db, ProductFilters(search="wireless studio")).limit(100),
+        ("ix_products_search_vector",),
+        False,
+    ),
+    (
+        "category filter",
+        lambda db: product_service._filtered_query(db, ProductFilters(category="Audio")).limit(100),
+        ("ix_products_categories_gin",),
+        False,
+    ),
+    (
+        "attribute filter",
+        lambda db: product_service._filtered_query(db, ProductFilters(attributes={"brand": ["Bose"]})).limit(100),
+        ("ix_products_attributes",),
+        False,
+    ),
+    (
+        "attribute + category filter",
+        lambda db: product_service._filtered_query(
+            db, ProductFilters(category="Gaming", attributes={"brand": ["ASUS"], "ram": ["32GB"]})
+        ).limit(100),
+        ("ix_products_attributes", "ix_products_categories_gin"),
+        False,
+    ),
+    ("sort=id", lambda db: _listing(db, "id"), ("products_pkey",), True),
+    ("sort=price", lambda db: _listing(db, "price"), ("ix_products_price_id",), True),
+    ("sort=-price", lambda db: _listing(db, "-price"), ("ix_products_price_id",), True),
+    ("sort=name", lambda db: _listing(db, "name"), ("ix_products_name_id",), True),
+    ("sort=newest", lambda db: _listing(db, "newest"), ("ix_products_created_at_id",), True),
+    (
+        "sort=price with price range",
+        lambda db: _listing(db, "price", ProductFilters(min_price=100, max_price=200)),
+        ("ix_products_price_id",),
+        True,
+    ),
+]
+
+
+def seed(db: Session, count: int, chunk_size: int = 5000):
+    print(f"Seeding {count} synthetic products...")
+    for start in range(0, count, chunk_size):
+        rows = []
+        for _ in range(min(chunk_size, count - start)):
+            brand = random.choice(BRANDS)
+            name = f"{brand} {' '.join(random.sample(WORDS, 2))} {random.randint(1, 9999)}"
+            rows.append({
+                "id": str(uuid4()),
+                "name": name,
+                "description": f"{name} with {' and '.join(random.sample(WORDS, 3))} features",
+                "categories": random.sample(CATEGORIES, 2),
+                "price": round(random.uniform(5, 3000), 2),
+                "images": [],
+                "stock": random.randint(0, 200),
+                "attributes": {"brand": brand, "ram": random.choice(["8GB", "16GB", "32GB"])},
+            })
+        db.execute(_upsert(rows))
+        db.commit()
+    db.execute(text("ANALYZE products"))
+    db.commit()
+
+
+def _collect(plan, key: str) -> set:
+    found = set()
+    if isinstance(plan, dict):
+        if key in plan:
+            found.add(plan[key])
+        for value in plan.values():
+            found |= _collect(value, key)
+    elif isinstance(plan, list):
+        for value in plan:
+            found |= _collect(value, key)
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN ANALYZE the product catalog queries")
+    parser.add_argument("--seed", type=int, default=0, help="synthetic products to add first")
+    parser.add_argument("--runs", type=int, default=5, help="timed runs per query")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    failures = 0
+    try:
+        if args.seed:
+            seed(db, args.seed)
+        total = db.execute(text("SELECT count(*) FROM products")).scalar()
+        print(f"Products in table: {total}\n")
+
+        for name, build, expected, forbid_sort in CHECKS:
+            statement = build(db).statement
+            timings = []
+            plan = None
+            for _ in range(args.runs):
+                plan = db.connection().execute(Explain(statement)).scalar()
+                timings.append(plan[0]["Execution Time"])
+            used = _collect(plan, "Index Name")
+            sorted_in_memory = "Sort" in _collect(plan, "Node Type")
+            ok = bool(used.intersection(expected)) and not (forbid_sort and sorted_in_memory)
+            failures += not ok
+            print(f"{'✓' if ok else '✗'} {name}: median execution {statistics.median(timings):.2f} ms")
+            print(f"    expected {' or '.join(expected)}, plan used {sorted(used) or 'no index'}")
+            if sorted_in_memory:
+                print("    plan sorts rows instead of reading them in index order")
+    finally:
+        db.rollback()
+        db.close()
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
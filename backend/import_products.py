@@ -0,0 +1,42 @@
+"""
+Bulk-load products from an NDJSON or CSV file straight into the database
+Run this script: python import_products.py products.ndjson [--format csv] [--chunk-size 1000]
+Use "-" as the path to read from stdin.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent))
+
+from app.database import SessionLocal
+from app.services.import_service import IMPORT_CHUNK_SIZE, IMPORT_FORMATS, detect_import_format, import_products
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import products from NDJSON or CSV")
+    parser.add_argument("path", help="file to import, or - for stdin")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, help="defaults to the file extension")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    fmt = args.format or detect_import_format(args.path)
+    stream = sys.stdin if args.path == "-" else open(args.path, encoding="utf-8", newline="")
+
+    db = SessionLocal()
+    try:
+        report = import_products(db, stream, fmt, chunk_size=args.chunk_size)
+    finally:
+        db.close()
+        if stream is not sys.stdin:
+            stream.close()
+
+    print(f"Processed {report.processed} rows, imported {report.imported}, {len(report.errors)} errors")
+    for error in report.errors:
+        print(f"  line {error.line}: {error.error}")
+    return 1 if report.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
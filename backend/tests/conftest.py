@@ -0,0 +1,47 @@
+"""
+Fixtures for tests that need the real Postgres database from DATABASE_URL.
+They are skipped when it cannot be reached.
+"""
+import sys
+from pathlib import Path
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+# Add the backend directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.config import get_settings
+from app.database import Base, SessionLocal, engine
+from app.models import User
+from app.security import create_access_token
+
+
+@pytest.fixture(scope="session")
+def database():
+    try:
+        Base.metadata.create_all(bind=engine)
+    except OperationalError as exc:
+        pytest.skip(f"Postgres is not reachable: {exc.orig}")
+
+
+@pytest.fixture
+def db(database):
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.close()
+
+
+@pytest.fixture
+def auth_headers(db):
+    user = User(email=f"test-{uuid4()}@example.invalid", password_hash="!", roles=["USER"], preferences=[])
+    db.add(user)
+    db.commit()
+    token = create_access_token(email=user.email, user_id=user.id, roles=user.roles, settings=get_settings())
+    yield {"Authorization": f"Bearer {token}"}
+    db.query(User).filter(User.id == user.id).delete(synchronize_session=False)
+    db.commit()
@@ -0,0 +1,91 @@
+import pytest
+
+from app import cache
+from app.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(cache, "time", fake)
+    return fake
+
+
+def test_entries_expire_after_ttl(clock):
+    products = TTLCache(maxsize=10, ttl=30)
+    products.set("p-1", "Laptop")
+
+    clock.now += 29.9
+    assert products.get("p-1") == "Laptop"
+
+    clock.now += 0.1
+    assert products.get("p-1") is None
+    assert products.stats()["size"] == 0
+
+
+def test_setting_again_restarts_the_ttl(clock):
+    products = TTLCache(maxsize=10, ttl=30)
+    products.set("p-1", "Laptop")
+    clock.now += 20
+    products.set("p-1", "Laptop Pro")
+    clock.now += 20
+
+    assert products.get("p-1") == "Laptop Pro"
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    products = TTLCache(maxsize=2, ttl=30)
+    products.set("p-1", "Laptop")
+    products.set("p-2", "Phone")
+    # Reading p-1 makes p-2 the least recently used
+    assert products.get("p-1") == "Laptop"
+
+    products.set("p-3", "Tablet")
+
+    assert products.get("p-2") is None
+    assert products.get("p-1") == "Laptop"
+    assert products.get("p-3") == "Tablet"
+    assert products.stats()["evictions"] == 1
+
+
+def test_invalidate_and_clear(clock):
+    products = TTLCache(maxsize=10, ttl=30)
+    products.set("p-1", "Laptop")
+    products.set("p-2", "Phone")
+
+    products.invalidate("p-1")
+    assert products.get("p-1") is None
+    assert products.get("p-2") == "Phone"
+
+    products.clear()
+    assert products.get("p-2") is None
+
+
+def test_stats_count_hits_and_misses(clock):
+    products = TTLCache(maxsize=10, ttl=30)
+    products.set("p-1", "Laptop")
+    products.get("p-1")
+    products.get("p-1")
+    products.get("p-2")
+
+    stats = products.stats()
+
+    assert (stats["hits"], stats["misses"], stats["size"]) == (2, 1, 1)
+    assert stats["hit_ratio"] == pytest.approx(2 / 3)
+
+
+@pytest.mark.parametrize("maxsize, ttl", [(0, 30), (10, 0)])
+def test_zero_size_or_ttl_disables_the_cache(clock, maxsize, ttl):
+    products = TTLCache(maxsize=maxsize, ttl=ttl)
+    products.set("p-1", "Laptop")
+
+    assert not products.enabled
+    assert products.get("p-1") is None
@@ -0,0 +1,74 @@
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from app.main import app
+from app.models import Product
+from app.schemas import CartItemsCreate
+from app.services import MAX_CART_ITEMS_PER_REQUEST, invalidate_product
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [{"items": []}, {"items": [{"productId": "p-1", "quantity": 0}]}, {"items": [{"productId": "p-1"}]}],
+    ids=["empty", "zero-quantity", "no-quantity"],
+)
+def test_items_payload_is_validated(payload):
+    with pytest.raises(ValidationError):
+        CartItemsCreate.model_validate(payload)
+
+
+@pytest.fixture
+def products(db):
+    rows = [
+        Product(id=f"test-{uuid4()}", name=name, categories=[], price=Decimal("2.50"), images=[], stock=stock)
+        for name, stock in (("Plenty", 10), ("Scarce", 1))
+    ]
+    db.add_all(rows)
+    db.commit()
+    ids = [row.id for row in rows]
+    yield ids
+    db.rollback()
+    db.query(Product).filter(Product.id.in_(ids)).delete(synchronize_session=False)
+    db.commit()
+    for product_id in ids:
+        invalidate_product(product_id)
+
+
+def test_repeated_products_become_one_line(products, auth_headers):
+    plenty, scarce = products
+    client = TestClient(app)
+    items = [
+        {"productId": plenty, "quantity": 2},
+        {"productId": scarce, "quantity": 1},
+        {"productId": plenty, "quantity": 3},
+    ]
+
+    response = client.post("/api/cart/items", json={"items": items}, headers=auth_headers)
+
+    assert response.status_code == 200
+    assert [(line["productId"], line["quantity"]) for line in response.json()] == [(plenty, 5), (scarce, 1)]
+    cart = client.get("/api/cart", headers=auth_headers).json()
+    assert sorted((line["productId"], line["quantity"]) for line in cart) == sorted([(plenty, 5), (scarce, 1)])
+
+
+def test_one_short_line_adds_nothing(products, auth_headers):
+    plenty, scarce = products
+    client = TestClient(app)
+    items = [{"productId": plenty, "quantity": 2}, {"productId": scarce, "quantity": 2}]
+
+    response = client.post("/api/cart/items", json={"items": items}, headers=auth_headers)
+
+    assert response.status_code == 400
+    assert client.get("/api/cart", headers=auth_headers).json() == []
+
+
+def test_too_many_items_is_a_400(auth_headers):
+    items = [{"productId": f"p-{n}", "quantity": 1} for n in range(MAX_CART_ITEMS_PER_REQUEST + 1)]
+
+    response = TestClient(app).post("/api/cart/items", json={"items": items}, headers=auth_headers)
+
+    assert response.status_code == 400
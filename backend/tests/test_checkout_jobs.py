@@ -0,0 +1,44 @@
+import pytest
+from fastapi import HTTPException
+
+from app.services.checkout_queue import CheckoutQueue
+
+
+@pytest.fixture
+def checkout_jobs():
+    # Workers are never started, so jobs stay queued until finished by hand
+    return CheckoutQueue(workers=1, batch_size=10, batch_window=0, max_queued=2, job_ttl=60)
+
+
+def test_unfinished_jobs_outlive_finished_ones(checkout_jobs):
+    waiting = checkout_jobs.submit("user-1")
+    # More finished jobs than the result cache holds, freeing a queue slot for each as a worker would
+    for n in range(10):
+        job = checkout_jobs.submit(f"user-{n + 2}")
+        checkout_jobs._queues[0].get_nowait()
+        checkout_jobs._finish(job, order_id=f"order-{n}")
+
+    assert checkout_jobs.get(waiting.id) is waiting
+    assert waiting.status == "queued"
+    assert checkout_jobs.get(job.id).status == "placed"
+
+
+def test_finished_job_moves_to_the_result_cache(checkout_jobs):
+    job = checkout_jobs.submit("user-1")
+
+    checkout_jobs._finish(job, error="Cart is empty", status_code=400)
+
+    assert job.id not in checkout_jobs._pending
+    assert checkout_jobs.get(job.id) is job
+    assert (job.status, job.status_code) == ("failed", 400)
+
+
+def test_full_queue_rejects_without_keeping_the_job(checkout_jobs):
+    checkout_jobs.submit("user-1")
+    checkout_jobs.submit("user-2")
+
+    with pytest.raises(HTTPException) as exc:
+        checkout_jobs.submit("user-3")
+
+    assert exc.value.status_code == 503
+    assert len(checkout_jobs._pending) == 2
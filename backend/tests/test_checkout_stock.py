@@ -0,0 +1,111 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import func
+
+from app.database import SessionLocal
+from app.models import Order, OrderItem, OutboxEvent, Product, User
+from app.services import create_order, invalidate_product
+from app.services.cart_store import cart_store
+
+BUYERS = 20
+STOCK = 5
+
+
+def _product(db, stock: int) -> Product:
+    product = Product(
+        id=f"test-{uuid4()}",
+        name="Checkout test item",
+        categories=[],
+        price=Decimal("9.99"),
+        images=[],
+        stock=stock,
+        attributes={},
+    )
+    db.add(product)
+    return product
+
+
+def _user(db) -> User:
+    user = User(email=f"test-{uuid4()}@example.invalid", password_hash="!", roles=["USER"], preferences=[])
+    db.add(user)
+    return user
+
+
+@pytest.fixture
+def cleanup(db):
+    product_ids, user_ids = [], []
+    yield product_ids, user_ids
+    db.rollback()
+    order_ids = db.query(Order.id).filter(Order.user_id.in_(user_ids))
+    db.query(OutboxEvent).filter(OutboxEvent.aggregate_id.in_(order_ids)).delete(synchronize_session=False)
+    db.query(User).filter(User.id.in_(user_ids)).delete(synchronize_session=False)
+    db.query(Product).filter(Product.id.in_(product_ids)).delete(synchronize_session=False)
+    db.commit()
+    for product_id in product_ids:
+        invalidate_product(product_id)
+
+
+def test_racing_checkouts_never_oversell(db, cleanup):
+    product_ids, user_ids = cleanup
+    product = _product(db, STOCK)
+    users = [_user(db) for _ in range(BUYERS)]
+    db.commit()
+    product_ids.append(product.id)
+    user_ids.extend(user.id for user in users)
+    # Straight into the carts: with holds on only the first buyers could reserve a unit
+    for user_id in user_ids:
+        cart_store.add_items(db, user_id, {product.id: 1})
+
+    start_line = threading.Barrier(BUYERS)
+    outcomes = []
+    lock = threading.Lock()
+
+    def checkout(user_id: str) -> None:
+        session = SessionLocal()
+        try:
+            start_line.wait(timeout=10)
+            try:
+                create_order(session, user_id)
+                outcome = 200
+            except HTTPException as exc:
+                outcome = exc.status_code
+            with lock:
+                outcomes.append(outcome)
+        finally:
+            session.close()
+
+    with ThreadPoolExecutor(max_workers=BUYERS) as pool:
+        list(pool.map(checkout, user_ids))
+
+    db.expire_all()
+    assert outcomes.count(200) == STOCK
+    assert outcomes.count(400) == BUYERS - STOCK
+    assert db.query(Product.stock).filter(Product.id == product.id).scalar() == 0
+    sold = db.query(func.sum(OrderItem.qty)).filter(OrderItem.product_id == product.id).scalar()
+    assert sold == STOCK
+
+
+def test_checkout_with_one_short_line_takes_nothing(db, cleanup):
+    product_ids, user_ids = cleanup
+    plenty, scarce = _product(db, 10), _product(db, 1)
+    user = _user(db)
+    db.commit()
+    product_ids.extend([plenty.id, scarce.id])
+    user_ids.append(user.id)
+    cart_store.add_items(db, user.id, {plenty.id: 2, scarce.id: 2})
+
+    with pytest.raises(HTTPException) as exc:
+        create_order(db, user.id)
+
+    assert exc.value.status_code == 400
+    assert exc.value.detail == "Insufficient stock for product: Checkout test item"
+    db.expire_all()
+    stock = dict(db.query(Product.id, Product.stock).filter(Product.id.in_(product_ids)))
+    assert stock == {plenty.id: 10, scarce.id: 1}
+    assert db.query(Order).filter(Order.user_id == user.id).count() == 0
+    assert {line.product_id: line.quantity for line in cart_store.lines(db, user.id)} == {plenty.id: 2, scarce.id: 2}
@@ -0,0 +1,25 @@
+import pytest
+
+from app.routers.products import _accepts_gzip
+
+
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [
+        ("", False),
+        ("gzip", True),
+        ("deflate, gzip;q=0.5", True),
+        ("GZIP ; Q=1", True),
+        ("x-gzip", True),
+        ("gzip;q=0", False),
+        ("gzip;q=0.0, deflate", False),
+        ("br, *", True),
+        ("*;q=0", False),
+        ("*, gzip;q=0", False),
+        ("gzip;q=0, *", False),
+        ("identity", False),
+        ("gzip;q=oops", False),
+    ],
+)
+def test_gzip_is_negotiated_with_q_values(header, expected):
+    assert _accepts_gzip(header) is expected
@@ -0,0 +1,26 @@
+from decimal import Decimal
+from uuid import uuid4
+
+from app.models import Product
+from app.services import ProductFilters, get_facets
+
+
+def test_reserved_units_do_not_count_as_in_stock(db):
+    category = f"test-{uuid4()}"
+    products = [
+        Product(id=f"test-{uuid4()}", name="Facet item", categories=[category], price=Decimal(price), images=[],
+                stock=stock, reserved=reserved)
+        for price, stock, reserved in (("10", 3, 1), ("30", 2, 2), ("700", 0, 0))
+    ]
+    db.add_all(products)
+    db.commit()
+    try:
+        facets = get_facets(db, ProductFilters(category=category))
+
+        assert (facets["total"], facets["in_stock"]) == (3, 1)
+        assert facets["categories"] == [{"name": category, "count": 3}]
+        assert [(bucket["min"], bucket["count"]) for bucket in facets["price_ranges"]] == [(0, 1), (25, 1), (500, 1)]
+    finally:
+        db.rollback()
+        db.query(Product).filter(Product.id.in_([product.id for product in products])).delete(synchronize_session=False)
+        db.commit()
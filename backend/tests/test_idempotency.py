@@ -0,0 +1,72 @@
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from app.models import Order, OutboxEvent, Product, User
+from app.services import create_order, invalidate_product, request_fingerprint
+from app.services.cart_store import cart_store
+
+
+def test_request_fingerprint_depends_on_every_part_in_order():
+    fingerprint = request_fingerprint("u-1", "POST", "/api/orders")
+
+    assert fingerprint == request_fingerprint("u-1", "POST", "/api/orders")
+    assert len(fingerprint) == 64
+    assert fingerprint != request_fingerprint("u-2", "POST", "/api/orders")
+    assert fingerprint != request_fingerprint("u-1", "POST", "/api/cart")
+    assert fingerprint != request_fingerprint("u-1", "POST/api", "orders")
+
+
+@pytest.fixture
+def shopper(db):
+    product = Product(
+        id=f"test-{uuid4()}",
+        name="Idempotency test item",
+        categories=[],
+        price=Decimal("5.00"),
+        images=[],
+        stock=10,
+        attributes={},
+    )
+    user = User(email=f"test-{uuid4()}@example.invalid", password_hash="!", roles=["USER"], preferences=[])
+    db.add_all([product, user])
+    db.commit()
+    yield user.id, product.id
+    db.rollback()
+    order_ids = db.query(Order.id).filter(Order.user_id == user.id)
+    db.query(OutboxEvent).filter(OutboxEvent.aggregate_id.in_(order_ids)).delete(synchronize_session=False)
+    db.query(User).filter(User.id == user.id).delete(synchronize_session=False)
+    db.query(Product).filter(Product.id == product.id).delete(synchronize_session=False)
+    db.commit()
+    invalidate_product(product.id)
+
+
+def test_retry_after_the_cart_was_refilled_replays_the_order(db, shopper):
+    user_id, product_id = shopper
+    fingerprint = request_fingerprint(user_id, "POST", "/api/orders")
+    key = str(uuid4())
+    cart_store.add_items(db, user_id, {product_id: 2})
+    first = create_order(db, user_id, key, fingerprint)
+
+    # The response was lost; meanwhile the client filled the cart again
+    cart_store.add_items(db, user_id, {product_id: 3})
+    retry = create_order(db, user_id, key, fingerprint)
+
+    assert retry.id == first.id
+    assert db.query(Order).filter(Order.user_id == user_id).count() == 1
+    assert db.query(Product.stock).filter(Product.id == product_id).scalar() == 8
+    assert [line.quantity for line in cart_store.lines(db, user_id)] == [3]
+
+
+def test_key_reused_for_another_request_is_a_422(db, shopper):
+    user_id, product_id = shopper
+    key = str(uuid4())
+    cart_store.add_items(db, user_id, {product_id: 1})
+    create_order(db, user_id, key, request_fingerprint(user_id, "POST", "/api/orders"))
+
+    with pytest.raises(HTTPException) as exc:
+        create_order(db, user_id, key, request_fingerprint(user_id, "POST", "/api/other"))
+
+    assert exc.value.status_code == 422
@@ -0,0 +1,88 @@
+import io
+import sys
+from decimal import Decimal
+
+import pytest
+
+from app.services import detect_import_format, import_products
+
+import_service = sys.modules["app.services.import_service"]
+
+
+@pytest.fixture
+def written(monkeypatch):
+    """Chunks as they would be written, without a database."""
+    chunks = []
+
+    def write_chunk(db, chunk, report):
+        chunks.append([values for _, values in chunk])
+        report.imported += len(chunk)
+
+    monkeypatch.setattr(import_service, "_write_chunk", write_chunk)
+    return chunks
+
+
+def test_detects_format_from_filename():
+    assert detect_import_format("catalog.CSV") == "csv"
+    assert detect_import_format("catalog.ndjson") == "ndjson"
+    assert detect_import_format(None) == "ndjson"
+
+
+def test_unknown_format_is_rejected(written):
+    with pytest.raises(ValueError):
+        import_products(None, io.StringIO(""), "xml")
+
+
+def test_ndjson_rows_are_validated_and_bad_lines_reported(written):
+    stream = io.StringIO(
+        '{"id": "p-1", "name": "Laptop", "price": "999.99", "stock": 5, "categories": ["Computers"]}\n'
+        "\n"
+        "{not json\n"
+        '{"id": "p-2", "name": "Phone", "stock": 3}\n'
+        '{"name": "Cable", "price": 4.5, "stock": "lots"}\n'
+        '{"name": "Mouse", "price": 19, "stock": 40}\n'
+    )
+
+    report = import_products(None, stream, "ndjson")
+
+    assert (report.processed, report.imported) == (5, 2)
+    errors = {error.line: error.error for error in report.errors}
+    assert sorted(errors) == [3, 4, 5]
+    assert errors[4].startswith("price:")
+    assert errors[5].startswith("stock:")
+    rows = written[0]
+    assert rows[0]["id"] == "p-1"
+    assert rows[0]["price"] == Decimal("999.99")
+    assert rows[0]["categories"] == ["Computers"]
+    # Rows without an id get a fresh one
+    assert rows[1]["name"] == "Mouse" and rows[1]["id"]
+
+
+def test_csv_lists_and_attributes_are_parsed(written):
+    stream = io.StringIO(
+        "id,name,price,stock,categories,images,attributes\n"
+        'p-1,Laptop,999.99,5,Computers| Laptops |,a.png|b.png,"{""brand"": ""Dell""}"\n'
+        "p-2,Phone,499,3,,,\n"
+        'p-3,Tablet,299,2,,,"{broken"\n'
+        "p-4,Watch,,1,,,\n"
+    )
+
+    report = import_products(None, stream, "csv")
+
+    assert (report.processed, report.imported) == (4, 2)
+    assert [error.line for error in report.errors] == [4, 5]
+    laptop, phone = written[0]
+    assert laptop["categories"] == ["Computers", "Laptops"]
+    assert laptop["images"] == ["a.png", "b.png"]
+    assert laptop["attributes"] == {"brand": "Dell"}
+    # Empty cells fall back to the schema defaults
+    assert (phone["categories"], phone["images"], phone["attributes"]) == ([], [], {})
+
+
+def test_rows_are_written_in_chunks(written):
+    stream = io.StringIO("".join(f'{{"name": "Item {n}", "price": 1, "stock": 1}}\n' for n in range(5)))
+
+    report = import_products(None, stream, "ndjson", chunk_size=2)
+
+    assert report.imported == 5
+    assert [len(chunk) for chunk in written] == [2, 2, 1]
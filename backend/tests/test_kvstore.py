@@ -0,0 +1,99 @@
+from decimal import Decimal
+
+import pytest
+
+from app import kvstore
+from app.kvstore import InMemoryKeyValueStore
+from app.services.cart_store import KeyValueCartStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(kvstore, "time", fake)
+    return fake
+
+
+def test_hash_commands_match_redis_return_values(clock):
+    kv = InMemoryKeyValueStore()
+
+    assert kv.hsetnx("cart", "p-1", "9.99") == 1
+    assert kv.hsetnx("cart", "p-1", "19.99") == 0
+    assert kv.hincrby("qty", "p-1", 2) == 2
+    assert kv.hincrby("qty", "p-1", 3) == 5
+    assert kv.hgetall("cart") == {"p-1": "9.99"}
+    assert kv.hgetall("qty") == {"p-1": "5"}
+    assert kv.hgetall("nothing") == {}
+
+
+def test_hdel_and_delete_report_what_they_removed(clock):
+    kv = InMemoryKeyValueStore()
+    kv.hincrby("qty", "p-1", 1)
+    kv.hincrby("qty", "p-2", 1)
+
+    assert kv.hdel("qty", "p-1", "p-9") == 1
+    assert kv.hdel("missing", "p-1") == 0
+    assert kv.delete("qty", "missing") == 1
+    assert kv.hgetall("qty") == {}
+
+
+def test_removing_the_last_field_drops_the_key(clock):
+    kv = InMemoryKeyValueStore()
+    kv.hincrby("qty", "p-1", 1)
+    kv.expire("qty", 60)
+
+    kv.hdel("qty", "p-1")
+
+    assert kv.expire("qty", 60) is False
+
+
+def test_keys_expire(clock):
+    kv = InMemoryKeyValueStore()
+    kv.hincrby("qty", "p-1", 1)
+
+    assert kv.expire("qty", 60) is True
+    assert kv.expire("missing", 60) is False
+    clock.now += 59
+    assert kv.hgetall("qty") == {"p-1": "1"}
+    clock.now += 1
+    assert kv.hgetall("qty") == {}
+    # Writing to an expired key starts a fresh hash
+    assert kv.hincrby("qty", "p-1", 1) == 1
+
+
+def test_expired_keys_are_swept_on_writes(clock, monkeypatch):
+    monkeypatch.setattr(InMemoryKeyValueStore, "SWEEP_EVERY", 2)
+    kv = InMemoryKeyValueStore()
+    kv.hincrby("stale", "p-1", 1)
+    kv.expire("stale", 10)
+    clock.now += 10
+
+    kv.hincrby("fresh", "p-1", 1)
+
+    assert "stale" not in kv._hashes
+    assert "stale" not in kv._expires
+
+
+def test_key_value_cart_store_reads_removes_and_clears(clock):
+    kv = InMemoryKeyValueStore()
+    carts = KeyValueCartStore(kv, ttl_seconds=60)
+    for product_id, price, quantity in (("p-1", "9.99", 2), ("p-2", "19.50", 1)):
+        kv.hsetnx("cart:guest:g1:price", product_id, price)
+        kv.hincrby("cart:guest:g1:qty", product_id, quantity)
+
+    lines = {line.product_id: (line.quantity, line.price) for line in carts.lines(None, "guest:g1")}
+    assert lines == {"p-1": (2, Decimal("9.99")), "p-2": (1, Decimal("19.50"))}
+
+    carts.remove(None, "guest:g1", "p-1")
+    assert [line.product_id for line in carts.lines(None, "guest:g1")] == ["p-2"]
+
+    carts.clear(None, "guest:g1")
+    assert carts.lines(None, "guest:g1") == []
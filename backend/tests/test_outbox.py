@@ -0,0 +1,93 @@
+import io
+import json
+from datetime import datetime
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.models import OutboxEvent, Product
+from app.services import CallbackSink, FileSink, import_products, invalidate_product
+from app.services.outbox_service import PRODUCT_CREATED, PRODUCT_UPDATED, OutboxDispatcher, _envelope, emit_event
+
+
+def test_emit_event_stores_a_json_payload_in_the_callers_session():
+    session = Session()
+    created = datetime(2024, 5, 1, 12, 30)
+
+    emit_event(session, PRODUCT_UPDATED, "p-1", {"price": Decimal("9.90"), "createdAt": created, "tags": ["a"]})
+
+    (event,) = session.new
+    assert (event.type, event.aggregate_id) == (PRODUCT_UPDATED, "p-1")
+    assert event.payload == {"price": "9.90", "createdAt": "2024-05-01T12:30:00", "tags": ["a"]}
+
+
+def test_emit_event_rejects_unserializable_payloads():
+    with pytest.raises(TypeError):
+        emit_event(Session(), PRODUCT_UPDATED, "p-1", {"blob": object()})
+
+
+def test_envelope_carries_the_stable_event_id():
+    event = OutboxEvent(
+        id=7, type=PRODUCT_CREATED, aggregate_id="p-1", payload={"name": "Lamp"},
+        created_at=datetime(2024, 5, 1, 12, 30),
+    )
+
+    assert _envelope(event) == {
+        "id": 7,
+        "type": PRODUCT_CREATED,
+        "aggregateId": "p-1",
+        "payload": {"name": "Lamp"},
+        "createdAt": "2024-05-01T12:30:00",
+    }
+
+
+def test_file_sink_appends_one_line_per_event(tmp_path):
+    path = tmp_path / "events.ndjson"
+    sink = FileSink("file", str(path))
+
+    sink.deliver([{"id": 1}, {"id": 2}])
+    sink.deliver([{"id": 3}])
+
+    assert [json.loads(line) for line in path.read_text().splitlines()] == [{"id": 1}, {"id": 2}, {"id": 3}]
+
+
+def test_sink_names_are_unique_per_dispatcher():
+    batches = []
+    dispatcher = OutboxDispatcher(batch_size=10, interval=1, retention_hours=0)
+    dispatcher.register(CallbackSink("audit", batches.append))
+
+    dispatcher.sinks["audit"].deliver([{"id": 1}])
+
+    assert batches == [[{"id": 1}]]
+    with pytest.raises(ValueError):
+        dispatcher.register(CallbackSink("audit", batches.append))
+
+
+def test_import_emits_created_then_updated_events(db):
+    ids = [f"test-{uuid4()}" for _ in range(2)]
+    first = json.dumps({"id": ids[0], "name": "Outbox lamp", "price": "12.50", "stock": 3})
+    second = json.dumps({"id": ids[1], "name": "Outbox desk", "price": "80", "stock": 1})
+    try:
+        import_products(db, io.StringIO(f"{first}\n{second}\n"), "ndjson")
+        import_products(db, io.StringIO(first.replace('"stock": 3', '"stock": 4') + "\n"), "ndjson")
+
+        events = (
+            db.query(OutboxEvent)
+            .filter(OutboxEvent.aggregate_id.in_(ids))
+            .order_by(OutboxEvent.txid, OutboxEvent.id)
+            .all()
+        )
+        assert [(event.type, event.aggregate_id) for event in events] == [
+            (PRODUCT_CREATED, ids[0]), (PRODUCT_CREATED, ids[1]), (PRODUCT_UPDATED, ids[0]),
+        ]
+        assert events[0].payload["price"] == "12.50"
+        assert (events[2].payload["stock"], events[2].payload["version"]) == (4, events[0].payload["version"] + 1)
+    finally:
+        db.rollback()
+        db.query(OutboxEvent).filter(OutboxEvent.aggregate_id.in_(ids)).delete(synchronize_session=False)
+        db.query(Product).filter(Product.id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
+        for product_id in ids:
+            invalidate_product(product_id)
@@ -0,0 +1,70 @@
+import base64
+import json
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.models import Order, Product
+from app.pagination import decode_cursor, encode_cursor, keyset_after
+
+PRICE_KEY = (Product.price, Product.id)
+ORDER_KEY = (Order.created_at, Order.id)
+
+
+def _forge(payload) -> str:
+    raw = json.dumps(payload).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def test_cursor_round_trips_typed_values():
+    created_at = datetime(2026, 10, 18, 12, 30, 15, 123456)
+
+    price_cursor = encode_cursor("price", [Decimal("19.90"), "p-1"])
+    order_cursor = encode_cursor("orders", [created_at, "o-1"])
+
+    assert decode_cursor(price_cursor, "price", PRICE_KEY) == [Decimal("19.90"), "p-1"]
+    assert decode_cursor(order_cursor, "orders", ORDER_KEY) == [created_at, "o-1"]
+
+
+def test_cursor_is_url_safe_without_padding():
+    cursor = encode_cursor("name", ["Ünïcode ~ name?", "p-1"])
+
+    assert "=" not in cursor
+    assert set(cursor) <= set("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_")
+
+
+def test_cursor_for_another_sort_is_rejected():
+    cursor = encode_cursor("price", [Decimal("19.90"), "p-1"])
+
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, "-price", PRICE_KEY)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not a cursor!",
+        base64.urlsafe_b64encode(b"\xff\xfe").decode("ascii"),
+        _forge(["price", "19.90"]),
+        _forge({"s": "price"}),
+        _forge({"s": "price", "k": ["19.90"]}),
+        _forge({"s": "price", "k": ["19.90", "p-1", "extra"]}),
+        _forge({"s": "price", "k": ["not a number", "p-1"]}),
+    ],
+    ids=["garbage", "not-utf8", "not-an-object", "no-key", "short-key", "long-key", "bad-value"],
+)
+def test_tampered_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, "price", PRICE_KEY)
+
+
+def test_keyset_after_compares_the_whole_row():
+    ascending = keyset_after(PRICE_KEY, [Decimal("19.90"), "p-1"])
+    descending = keyset_after(PRICE_KEY, [Decimal("19.90"), "p-1"], descending=True)
+
+    assert str(ascending.compile(dialect=postgresql.dialect())) == (
+        "(products.price, products.id) > (%(param_1)s, %(param_2)s)"
+    )
+    assert " < " in str(descending.compile(dialect=postgresql.dialect()))
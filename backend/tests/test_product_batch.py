@@ -0,0 +1,61 @@
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models import Product
+from app.services import MAX_BATCH_IDS, get_products_by_ids, invalidate_product
+from app.services.product_service import product_cache
+
+
+def test_too_many_ids_is_a_400():
+    ids = ",".join(f"p-{n}" for n in range(MAX_BATCH_IDS + 1))
+
+    response = TestClient(app).get("/api/products/batch", params={"ids": ids})
+
+    assert response.status_code == 400
+
+
+@pytest.fixture
+def product_ids(db):
+    ids = [f"test-{uuid4()}" for _ in range(3)]
+    db.add_all([
+        Product(id=product_id, name=f"Batch item {n}", categories=[], price=Decimal("1.00"), images=[], stock=1)
+        for n, product_id in enumerate(ids)
+    ])
+    db.commit()
+    yield ids
+    db.rollback()
+    db.query(Product).filter(Product.id.in_(ids)).delete(synchronize_session=False)
+    db.commit()
+    for product_id in ids:
+        invalidate_product(product_id)
+
+
+def test_lookup_keeps_request_order_and_reports_missing(db, product_ids):
+    first, second, third = product_ids
+    missing = f"missing-{uuid4()}"
+    # One product already cached, the rest loaded with one IN query
+    get_products_by_ids(db, [second])
+    assert product_cache.get(second) is not None or not product_cache.enabled
+
+    products, not_found = get_products_by_ids(db, [third, missing, second, first, third])
+
+    assert [product.id for product in products] == [third, second, first]
+    assert not_found == [missing]
+
+
+def test_batch_endpoint_accepts_repeated_and_comma_separated_ids(product_ids):
+    first, second, third = product_ids
+    missing = f"missing-{uuid4()}"
+
+    response = TestClient(app).get(
+        "/api/products/batch", params=[("ids", f"{second}, {missing}"), ("ids", first)],
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["id"] for item in body["items"]] == [second, first]
+    assert body["missing"] == [missing]
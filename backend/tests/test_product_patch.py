@@ -0,0 +1,41 @@
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+
+from app.models import OutboxEvent, Product
+from app.services import VersionConflictError, invalidate_product, patch_product
+
+
+@pytest.fixture
+def product_id(db):
+    product = Product(id=f"test-{uuid4()}", name="Patch item", categories=[], price=Decimal("3.00"), images=[], stock=2)
+    db.add(product)
+    db.commit()
+    yield product.id
+    db.rollback()
+    db.query(OutboxEvent).filter(OutboxEvent.aggregate_id == product.id).delete(synchronize_session=False)
+    db.query(Product).filter(Product.id == product.id).delete(synchronize_session=False)
+    db.commit()
+    invalidate_product(product.id)
+
+
+def test_stale_version_conflicts(db, product_id):
+    patch_product(db, product_id, {"stock": 5}, expected_version=1)
+
+    with pytest.raises(VersionConflictError):
+        patch_product(db, product_id, {"stock": 6}, expected_version=1)
+
+
+def test_version_only_patch_still_checks_the_version(db, product_id):
+    patch_product(db, product_id, {"stock": 5}, expected_version=1)
+
+    with pytest.raises(VersionConflictError):
+        patch_product(db, product_id, {}, expected_version=1)
+    product = patch_product(db, product_id, {}, expected_version=2)
+    assert (product.version, product.stock) == (2, 5)
+
+
+def test_empty_patch_of_a_missing_product_is_not_found(db):
+    with pytest.raises(ValueError):
+        patch_product(db, f"missing-{uuid4()}", {}, expected_version=1)
@@ -0,0 +1,95 @@
+"""
+EXPLAIN the catalog and order history queries and check Postgres can serve them from their indexes.
+
+Sequential scans are turned off for the test's transaction: on a small test table the planner
+rightly prefers them, and what these tests guard is that each query still matches its index.
+"""
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app.pagination import keyset_after
+from app.services.order_service import ORDER_HISTORY_KEY, _history_query
+from app.services.product_service import SORT_KEYS, ProductFilters, _filtered_query, _sorted
+
+
+class Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def _plan(db, query):
+    db.execute(text("SET LOCAL enable_seqscan = off"))
+    return db.connection().execute(Explain(query.statement)).scalar()
+
+
+def _collect(plan, key: str) -> set:
+    found = set()
+    if isinstance(plan, dict):
+        if key in plan:
+            found.add(plan[key])
+        for value in plan.values():
+            found |= _collect(value, key)
+    elif isinstance(plan, list):
+        for value in plan:
+            found |= _collect(value, key)
+    return found
+
+
+@pytest.mark.parametrize(
+    "filters, index",
+    [
+        (ProductFilters(search="wireless studio"), "ix_products_search_vector"),
+        (ProductFilters(category="Audio"), "ix_products_categories_gin"),
+        (ProductFilters(attributes={"brand": ["Bose"]}), "ix_products_attributes"),
+    ],
+    ids=["search", "category", "attributes"],
+)
+def test_filters_use_their_gin_index(db, filters, index):
+    plan = _plan(db, _filtered_query(db, filters).limit(100))
+
+    assert index in _collect(plan, "Index Name")
+    assert "Bitmap Index Scan" in _collect(plan, "Node Type")
+
+
+@pytest.mark.parametrize(
+    "sort, index, boundary",
+    [
+        ("id", "products_pkey", ["p-100"]),
+        ("price", "ix_products_price_id", [Decimal("99.99"), "p-100"]),
+        ("-price", "ix_products_price_id", [Decimal("99.99"), "p-100"]),
+        ("name", "ix_products_name_id", ["Laptop", "p-100"]),
+        ("newest", "ix_products_created_at_id", [datetime(2026, 1, 1), "p-100"]),
+    ],
+)
+def test_keyset_pages_read_their_sort_index_in_order(db, sort, index, boundary):
+    columns, descending = SORT_KEYS[sort]
+    query = _sorted(_filtered_query(db, ProductFilters()), sort)
+    query = query.filter(keyset_after(columns, boundary, descending)).limit(21)
+
+    plan = _plan(db, query)
+
+    assert index in _collect(plan, "Index Name")
+    assert "Sort" not in _collect(plan, "Node Type")
+
+
+def test_order_history_page_reads_its_index_in_order(db):
+    boundary = [datetime(2026, 1, 1), "o-100"]
+    query = _history_query(db, "u-1", summary=True)
+    query = query.filter(keyset_after(ORDER_HISTORY_KEY, boundary, descending=True)).limit(21)
+
+    plan = _plan(db, query)
+
+    assert "ix_orders_user_created_at_id" in _collect(plan, "Index Name")
+    assert "Sort" not in _collect(plan, "Node Type")
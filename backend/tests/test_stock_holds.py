@@ -0,0 +1,30 @@
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models import StockHold
+from app.services.reservation_service import place_holds
+
+
+def test_place_holds_rejects_unknown_product(db):
+    owner = f"guest:{uuid4()}"
+    missing = f"missing-{uuid4()}"
+
+    with pytest.raises(HTTPException) as exc:
+        place_holds(db, owner, {missing: 1})
+
+    assert exc.value.status_code == 400
+    assert exc.value.detail == f"Product not found: {missing}"
+    assert db.query(StockHold).filter(StockHold.owner == owner).count() == 0
+
+
+def test_adding_unknown_product_to_cart_is_a_400(auth_headers):
+    missing = f"missing-{uuid4()}"
+
+    response = TestClient(app).post("/api/cart", json={"productId": missing, "quantity": 1}, headers=auth_headers)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == f"Product not found: {missing}"
@@ -0,0 +1,66 @@
+import sys
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+from pydantic import ValidationError
+
+from app.models import OutboxEvent, Product
+from app.schemas import StockSyncItem
+from app.services import invalidate_product, sync_stock
+from app.services.outbox_service import PRODUCT_UPDATED
+
+inventory_service = sys.modules["app.services.inventory_service"]
+
+
+@pytest.mark.parametrize("fields", [{}, {"stock": 5, "delta": 1}, {"stock": -1}])
+def test_item_needs_exactly_one_valid_change(fields):
+    with pytest.raises(ValidationError):
+        StockSyncItem(product_id="p-1", **fields)
+
+
+def test_repeated_ids_fold_in_request_order():
+    items = [
+        StockSyncItem(product_id="p-1", delta=2),
+        StockSyncItem(product_id="p-1", delta=-1),
+        StockSyncItem(product_id="p-2", delta=4),
+        StockSyncItem(product_id="p-2", stock=10),
+        StockSyncItem(product_id="p-2", delta=-3),
+        StockSyncItem(product_id="p-3", stock=7),
+    ]
+
+    assert inventory_service._merge(items) == {"p-1": (1, True), "p-2": (7, False), "p-3": (7, False)}
+
+
+def test_sync_sets_levels_applies_deltas_and_rejects_negative_stock(db):
+    ids = [f"test-{uuid4()}" for _ in range(3)]
+    db.add_all([
+        Product(id=product_id, name="Stock sync item", categories=[], price=Decimal("1.00"), images=[], stock=5)
+        for product_id in ids
+    ])
+    db.commit()
+    missing = f"missing-{uuid4()}"
+    try:
+        report = sync_stock(db, [
+            StockSyncItem(product_id=ids[0], stock=20),
+            StockSyncItem(product_id=ids[1], delta=-2),
+            StockSyncItem(product_id=ids[2], delta=-6),
+            StockSyncItem(product_id=missing, stock=1),
+        ], chunk_size=2)
+
+        assert report.updated == {ids[0]: 20, ids[1]: 3}
+        assert report.rejected == [ids[2]]
+        assert report.missing == [missing]
+        db.expire_all()
+        assert db.get(Product, ids[2]).stock == 5
+        events = db.query(OutboxEvent).filter(OutboxEvent.aggregate_id.in_(ids)).all()
+        assert sorted((event.type, event.aggregate_id, event.payload["stock"]) for event in events) == sorted(
+            [(PRODUCT_UPDATED, ids[0], 20), (PRODUCT_UPDATED, ids[1], 3)]
+        )
+    finally:
+        db.rollback()
+        db.query(OutboxEvent).filter(OutboxEvent.aggregate_id.in_(ids)).delete(synchronize_session=False)
+        db.query(Product).filter(Product.id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
+        for product_id in ids:
+            invalidate_product(product_id)
@@ -0,0 +1,130 @@
+import random
+from collections import Counter
+
+import pytest
+
+from app.services import suggest_service
+from app.services.suggest_service import PrefixIndex
+
+
+def _texts(index: PrefixIndex, prefix: str, limit: int = 10):
+    return [suggestion.text for suggestion in index.suggest(prefix, limit)]
+
+
+@pytest.fixture
+def index():
+    index = PrefixIndex()
+    index.rebuild([
+        ("p-1", "MacBook Pro", ["Laptops"], 5),
+        ("p-2", "MacBook Air", ["Laptops"], 9),
+        ("p-3", "Magic Mouse", ["Accessories"], 1),
+    ])
+    return index
+
+
+def test_matches_names_from_any_word_ranked_by_popularity(index):
+    assert _texts(index, "mac") == ["MacBook Air", "MacBook Pro"]
+    assert _texts(index, "  PRO") == ["MacBook Pro"]
+    assert _texts(index, "lap") == ["Laptops"]
+    assert _texts(index, "ma", limit=2) == ["MacBook Air", "MacBook Pro"]
+    assert _texts(index, "") == []
+
+
+def test_insert_rename_and_delete(index):
+    index.upsert_product("p-4", "Magic Keyboard", ["Accessories"])
+    assert "Magic Keyboard" in _texts(index, "magic")
+
+    index.upsert_product("p-1", "Studio Display", ["Monitors"])
+    assert _texts(index, "mac") == ["MacBook Air"]
+    assert _texts(index, "disp") == ["Studio Display"]
+    assert _texts(index, "mon") == ["Monitors"]
+
+    index.remove_product("p-2")
+    assert _texts(index, "mac") == []
+    # The last laptop is gone, and so is its category
+    assert _texts(index, "lap") == []
+
+
+def test_popularity_reorders_and_survives_a_rename(index):
+    index.add_popularity("p-1", 10)
+    assert _texts(index, "macbook") == ["MacBook Pro", "MacBook Air"]
+
+    index.upsert_product("p-1", "MacBook Pro 16", ["Laptops"])
+    assert _texts(index, "macbook") == ["MacBook Pro 16", "MacBook Air"]
+
+    index.add_popularity("p-1", -10)
+    assert _texts(index, "macbook") == ["MacBook Air", "MacBook Pro 16"]
+
+
+def test_category_popularity_counts_its_products(index):
+    index.upsert_product("p-3", "Magic Mouse", ["Accessories", "Laptops"])
+
+    suggestions = {suggestion.text: suggestion.popularity for suggestion in index.suggest("laptops")}
+
+    assert suggestions == {"Laptops": 3}
+
+
+@pytest.mark.parametrize("bulk_rows", [1000, 3])
+def test_memoized_top_lists_stay_exact(monkeypatch, bulk_rows):
+    # Small limits so most prefixes are memoized, top lists fill up and refills happen
+    monkeypatch.setattr(suggest_service, "MAX_SUGGESTIONS", 5)
+    monkeypatch.setattr(suggest_service, "SCAN_LIMIT", 8)
+    monkeypatch.setattr(suggest_service, "BULK_MERGE_ROWS", bulk_rows)
+    rng = random.Random(7)
+    words = ["ab", "abc", "abd", "abcd", "b", "ba", "pro", "mac", "a"]
+    categories = ["x", "xy", "z", "ab"]
+    products, popularity = {}, {}
+
+    def name():
+        return " ".join(rng.choice(words) for _ in range(rng.randint(1, 3)))
+
+    def entries():
+        # Every entry's index keys and rank, worked out from scratch
+        found = [
+            (suggest_service._index_keys(text), (popularity[product_id], -len(text)))
+            for product_id, (text, _) in products.items()
+        ]
+        counts = Counter(category for _, cats in products.values() for category in set(cats))
+        found += [
+            (suggest_service._index_keys(category), (count, -len(category)))
+            for category, count in counts.items()
+        ]
+        return found
+
+    def expected(found, prefix):
+        ranks = [rank for keys, rank in found if any(key.startswith(prefix) for key in keys)]
+        return sorted(ranks, reverse=True)[:5]
+
+    for number in range(60):
+        products[f"p-{number}"] = (name(), rng.sample(categories, rng.randint(0, 2)))
+        popularity[f"p-{number}"] = rng.randint(0, 20)
+    index = PrefixIndex()
+    index.rebuild((product_id, text, cats, popularity[product_id]) for product_id, (text, cats) in products.items())
+
+    for _ in range(150):
+        action = rng.random()
+        if action < 0.4:
+            batch = []
+            for _ in range(rng.randint(1, 6)):
+                product_id = f"p-{rng.randint(0, 80)}"
+                products[product_id] = (name(), rng.sample(categories, rng.randint(0, 2)))
+                popularity.setdefault(product_id, 0)
+                batch.append((product_id, *products[product_id]))
+            index.upsert_products(batch)
+        elif action < 0.6:
+            product_id = rng.choice(list(products))
+            index.remove_product(product_id)
+            del products[product_id], popularity[product_id]
+        else:
+            product_id = rng.choice(list(products))
+            amount = max(rng.randint(-8, 5), -popularity[product_id])
+            index.add_popularity(product_id, amount)
+            popularity[product_id] += amount
+
+        assert index._keys == sorted(index._keys)
+        found = entries()
+        for prefix, top in index._memo.items():
+            assert [suggest_service._rank(entry) for entry in top] == expected(found, prefix), prefix
+        for prefix in ("a", "ab", "abc", "b a", "pro", "x"):
+            ranks = [suggest_service._rank(entry) for entry in index.suggest(prefix, 5)]
+            assert ranks == expected(found, prefix), prefix